@@ -0,0 +1,64 @@
+"""Chunk embedding throughput for index construction.
+
+Run from the repository root:
+
+    python -m benchmarks.embedding_throughput --batch-size 64
+
+Compares the previous per-article embedding calls with the deduplicated,
+batched embed_texts stage, with a cold and a warm embedding cache, and
+reports how many chunks still need embedding after re-chunking with a
+different chunk size.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from src import constants
+from src.data_preparation import DataPreparation
+from src.embedding_cache import EmbeddingCache, embed_texts
+from src.embeddings import get_embeddings
+
+
+def per_article_baseline(documents, embeddings):
+    # One embed_documents call per article, as Chroma.from_documents did
+    grouped = {}
+    for doc in documents:
+        grouped.setdefault(doc.metadata["article_number"], []).append(doc.page_content)
+    start = time.perf_counter()
+    for texts in grouped.values():
+        embeddings.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    return {"chunks": len(documents), "seconds": elapsed, "chunks_per_second": len(documents) / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk embedding throughput")
+    parser.add_argument("--batch-size", type=int, default=constants.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--rechunk-size", type=int, default=400, help="Chunk size for the re-chunking run")
+    args = parser.parse_args()
+
+    data_preparation = DataPreparation()
+    documents = data_preparation.prepare_documents()
+    rechunked = data_preparation.prepare_documents(chunk_size=args.rechunk_size)
+    texts = [doc.page_content for doc in documents]
+    embeddings = get_embeddings()
+    embeddings.embed_documents(texts[:8])  # warm up the model
+
+    results = {"per_article": per_article_baseline(documents, embeddings)}
+    _, results["batched"] = embed_texts(texts, embeddings, batch_size=args.batch_size)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(os.path.join(directory, "embeddings.sqlite"))
+        _, results["cold_cache"] = embed_texts(texts, embeddings, cache, args.batch_size)
+        _, results["warm_cache"] = embed_texts(texts, embeddings, cache, args.batch_size)
+        _, results[f"rechunked_{args.rechunk_size}"] = embed_texts(
+            [doc.page_content for doc in rechunked], embeddings, cache, args.batch_size
+        )
+        cache.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Offline retrieval evaluation: recall@k, MRR and queries/sec.
+
+Run from the repository root:
+
+    python -m benchmarks.evaluate_retrieval --top-k 3
+    python -m benchmarks.evaluate_retrieval \
+        --grid keyword_match_score=0.1,0.3,0.5 --grid summary_similarity_score=0.3,0.5,1.0
+
+Questions are labeled with the articles (and optionally pages) that answer
+them, see benchmarks/eval_questions.json. Chunk, question and summary
+embeddings are computed once (chunks through the embedding cache), so every
+grid setting only re-runs the scoring. Retrieval uses the flat backend, which
+returns the same chunks as the Chroma one.
+"""
+import argparse
+import json
+
+from src import constants
+from src.data_preparation import DataPreparation
+from src.embedding_cache import EmbeddingCache
+from src.evaluation import load_questions, prepare_evaluation, run_evaluation, weight_grid
+
+QUESTIONS_PATH = "benchmarks/eval_questions.json"
+
+
+def parse_grid(specs):
+    # ["keyword_match_score=0.1,0.3"] -> {"keyword_match_score": [0.1, 0.3]}
+    values_by_name = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        values_by_name[name] = [float(value) for value in values.split(",")]
+    return values_by_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval evaluation")
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, at most 8)")
+    parser.add_argument("--search-mode", choices=["dense", "hybrid"], default="dense")
+    parser.add_argument("--grid", action="append", default=[], metavar="WEIGHT=V1,V2,...", help="Weight values to sweep")
+    parser.add_argument("--embedding-cache-path", default=constants.EMBEDDING_CACHE_PATH)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    documents = DataPreparation().prepare_documents()
+    embedding_cache = EmbeddingCache(args.embedding_cache_path)
+    state = prepare_evaluation(
+        questions, documents, embedding_cache=embedding_cache, search_mode=args.search_mode
+    )
+    embedding_cache.close()
+
+    report = run_evaluation(
+        state,
+        questions,
+        grid=weight_grid(parse_grid(args.grid)),
+        top_k=args.top_k,
+        workers=args.workers,
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
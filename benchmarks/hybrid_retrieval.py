@@ -0,0 +1,94 @@
+"""Compare dense-only and hybrid (BM25 + dense, RRF) chunk search.
+
+Run from the repository root:
+
+    python -m benchmarks.hybrid_retrieval --backend flat --top-k 5
+
+Recall is measured on exact-term queries built from the legal identifiers
+(LEGAL_NUMBER_PATTERN) found in the corpus: the relevant chunks for a query
+are the chunks that contain its identifier.
+"""
+import argparse
+import json
+import statistics
+import time
+from collections import Counter
+
+from src import constants
+from src.data_preparation import DataPreparation
+from src.vectorization import FlatVectorStore, SegregatedVectorStore
+
+QUERIES_PATH = "benchmarks/queries.json"
+
+
+def exact_term_queries(documents, limit):
+    # (query, relevant chunk contents) for the most frequent legal identifiers
+    counts = Counter(
+        identifier
+        for doc in documents
+        for identifier in set(constants.LEGAL_NUMBER_PATTERN.findall(doc.page_content))
+    )
+    return [
+        (
+            f"What does {identifier} say?",
+            {doc.page_content for doc in documents if identifier in doc.page_content},
+        )
+        for identifier, _ in counts.most_common(limit)
+    ]
+
+
+def evaluate(store, queries, query_embeddings, top_k, repeats):
+    recalls = []
+    latencies = []
+    for (query, relevant), query_embedding in zip(queries, query_embeddings):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results = store.search(query, top_k=top_k, query_embedding=query_embedding)
+            latencies.append((time.perf_counter() - start) * 1000)
+        if relevant:
+            retrieved = {doc.page_content for doc, _ in results}
+            recalls.append(len(retrieved & relevant) / min(len(relevant), top_k))
+    latencies.sort()
+    return {
+        f"recall@{top_k}": statistics.fmean(recalls) if recalls else None,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense vs hybrid chunk search")
+    parser.add_argument("--backend", choices=["chroma", "flat"], default="flat")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=25, help="Number of exact-term queries")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = DataPreparation().prepare_documents()
+    store_class = FlatVectorStore if args.backend == "flat" else SegregatedVectorStore
+    store = store_class(documents)
+    # Build the BM25 index outside of the timed searches
+    store.bm25_index
+
+    with open(QUERIES_PATH, "r") as f:
+        natural_queries = [(query, set()) for query in json.load(f)]
+    term_queries = exact_term_queries(documents, args.queries)
+    term_embeddings = store.embeddings.embed_documents([query for query, _ in term_queries])
+    natural_embeddings = store.embeddings.embed_documents([query for query, _ in natural_queries])
+
+    report = {"backend": args.backend, "chunks": len(documents), "exact_term_queries": len(term_queries)}
+    for search_mode in ("dense", "hybrid"):
+        store.search_mode = search_mode
+        exact = evaluate(store, term_queries, term_embeddings, args.top_k, args.repeats)
+        natural = evaluate(store, natural_queries, natural_embeddings, args.top_k, args.repeats)
+        report[search_mode] = {
+            f"exact_term_recall@{args.top_k}": exact[f"recall@{args.top_k}"],
+            "exact_term_p50_ms": exact["p50_ms"],
+            "natural_p50_ms": natural["p50_ms"],
+            "natural_p99_ms": natural["p99_ms"],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Load test for the HTTP query server.
+
+Start the server with a stub LLM, then run the load test against it:
+
+    python server.py --llm-backend stub --persistent-index
+    python -m benchmarks.load_test --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+QUERIES = [
+    "What is personal data?",
+    "How to obtain valid consent?",
+    "What are the principles of data processing?",
+    "Explain the right to erasure",
+    "Tell me about C-136/17",
+    "What is Article 20 about?",
+    "When can a data subject object to processing?",
+    "What information must be given to the data subject?",
+]
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def wait_until_ready(client, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError("Server did not become ready in time")
+
+
+async def run_load_test(url, total_requests, concurrency, ready_timeout):
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        await wait_until_ready(client, ready_timeout)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def send(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/query", json={"query": QUERIES[i % len(QUERIES)], "include_documents": False}
+                )
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "qps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the GDPR RAG HTTP server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ready-timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args.url, args.requests, args.concurrency, args.ready_timeout))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
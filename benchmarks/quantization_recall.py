@@ -0,0 +1,92 @@
+"""Memory per chunk and recall@k of compressed FlatVectorStore variants.
+
+Run from the repository root:
+
+    python -m benchmarks.quantization_recall --top-k 10
+
+Recall@k is measured against the full-precision float32 store over all
+articles. "rescore_factor 1" shows the compressed search alone, larger
+factors shortlist more candidates and rescore them from the full-precision
+vectors on disk.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from src.data_preparation import DataPreparation
+from src.vectorization import FlatVectorStore
+
+QUERIES_PATH = "benchmarks/queries.json"
+VARIANTS = [
+    {"quantization": "int8", "pca_dimensions": None},
+    {"quantization": None, "pca_dimensions": 128},
+    {"quantization": "int8", "pca_dimensions": 128},
+    {"quantization": "int8", "pca_dimensions": 64},
+]
+
+
+def search_all(store, queries, query_embeddings, top_k):
+    results = []
+    latencies = []
+    for query, query_embedding in zip(queries, query_embeddings):
+        start = time.perf_counter()
+        found = store.search(query, top_k=top_k, query_embedding=query_embedding)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({id(doc) for doc, _ in found})
+    return results, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed vector storage memory and recall")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--chunk-queries", type=int, default=100, help="Chunk texts used as extra queries")
+    args = parser.parse_args()
+
+    documents = DataPreparation().prepare_documents()
+    baseline = FlatVectorStore(documents)
+    # Reuse the baseline vectors (in documents order) instead of re-embedding for every variant
+    positions = {id(doc): row for row, doc in enumerate(baseline.documents)}
+    vectors = baseline.matrix[[positions[id(doc)] for doc in documents]]
+
+    with open(QUERIES_PATH, "r") as f:
+        queries = json.load(f)
+    step = max(1, len(documents) // args.chunk_queries)
+    queries += [doc.page_content[:200] for doc in documents[::step]]
+    query_embeddings = baseline.embeddings.embed_documents(queries)
+
+    expected, baseline_ms = search_all(baseline, queries, query_embeddings, args.top_k)
+    report = {
+        "chunks": len(documents),
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "float32": {"bytes_per_chunk": baseline.bytes_per_chunk(), "p50_ms": baseline_ms},
+        "variants": [],
+    }
+    for variant in VARIANTS:
+        for rescore_factor in (1, 4):
+            store = FlatVectorStore(
+                documents,
+                embeddings=baseline.embeddings,
+                vectors=vectors,
+                rescore_factor=rescore_factor,
+                **variant,
+            )
+            found, p50_ms = search_all(store, queries, query_embeddings, args.top_k)
+            recall = np.mean([len(a & b) / len(b) for a, b in zip(found, expected)])
+            report["variants"].append(
+                dict(
+                    variant,
+                    rescore_factor=rescore_factor,
+                    bytes_per_chunk=store.bytes_per_chunk(),
+                    recall_at_k=float(recall),
+                    p50_ms=p50_ms,
+                )
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
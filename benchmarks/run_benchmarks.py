@@ -0,0 +1,226 @@
+"""Per-stage latency benchmarks for the retrieval pipeline.
+
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --baseline results.json --max-regression 20
+
+With --baseline, the run fails (exit code 1) when the median time of any
+stage is more than --max-regression percent above the baseline.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src import constants
+from src.data_loading import load_article_summaries, load_documents_snapshot, save_documents_snapshot
+from src.data_preparation import DataPreparation, create_text_splitter
+from src.generator import Generator
+from src.keywords_extraction import extract_keywords_batch
+from src.llm_backends import StubBackend
+from src.retriever import Retriever
+from src.vectorization import FlatVectorStore, SegregatedVectorStore
+
+QUERIES_PATH = "benchmarks/queries.json"
+
+
+def time_call(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def benchmark_startup(repeats, backend):
+    timings = {
+        "pdf_parse": [],
+        "chunking": [],
+        "keyword_extraction": [],
+        "snapshot_load": [],
+        "index_build": [],
+    }
+    data_preparation = DataPreparation()
+    text_splitter = create_text_splitter(
+        constants.DEFAULT_CHUNK_SIZE, constants.DEFAULT_CHUNK_OVERLAP
+    )
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pages = data_preparation.extract_pdf_text(constants.PDF_PATH)
+        cleaned_articles = data_preparation.clean_articles(data_preparation.parse_articles(pages))
+        timings["pdf_parse"].append((time.perf_counter() - start) * 1000)
+
+        article_contents = [
+            " ".join(content for _, content in pages) for pages in cleaned_articles.values()
+        ]
+        _, elapsed = time_call(
+            lambda: [
+                data_preparation.chunk_article(
+                    text_splitter, pages, content, constants.DEFAULT_CHUNK_OVERLAP
+                )
+                for pages, content in zip(cleaned_articles.values(), article_contents)
+            ]
+        )
+        timings["chunking"].append(elapsed)
+
+        _, elapsed = time_call(extract_keywords_batch, article_contents)
+        timings["keyword_extraction"].append(elapsed)
+
+    documents = data_preparation.prepare_documents()
+    with tempfile.TemporaryDirectory() as snapshot_path:
+        save_documents_snapshot(snapshot_path, documents, "benchmark")
+        for _ in range(repeats):
+            _, elapsed = time_call(load_documents_snapshot, snapshot_path, "benchmark")
+            timings["snapshot_load"].append(elapsed)
+
+    store_class = FlatVectorStore if backend == "flat" else SegregatedVectorStore
+    vector_store = None
+    for _ in range(repeats):
+        vector_store, elapsed = time_call(store_class, documents)
+        timings["index_build"].append(elapsed)
+
+    return documents, vector_store, timings
+
+
+def benchmark_queries(documents, vector_store, queries, repeats):
+    retriever = Retriever(vector_store)
+    generator = Generator(StubBackend(latency=0.0, tokens_per_second=0))
+    timings = {
+        "query_embedding": [],
+        "article_scores": [],
+        "vector_search": [],
+        "select_relevant_parts": [],
+        "prompt_assembly": [],
+    }
+
+    for _ in range(repeats):
+        for query in queries:
+            query_embedding, elapsed = time_call(retriever.embeddings.embed_query, query)
+            timings["query_embedding"].append(elapsed)
+
+            scored_articles, elapsed = time_call(
+                retriever._calculate_article_scores, query, query_embedding, documents
+            )
+            timings["article_scores"].append(elapsed)
+
+            relevant_articles, article_scores = retriever._select_relevant_articles(
+                query, query_embedding, documents, 3
+            )
+            article_numbers = [
+                str(article["article_number"]) for article in article_scores
+            ]
+            _, elapsed = time_call(
+                vector_store.search,
+                query,
+                article_numbers=article_numbers,
+                top_k=constants.NUMBER_OF_PARTS_TO_RETRIEVE,
+                query_embedding=query_embedding,
+            )
+            timings["vector_search"].append(elapsed)
+
+            relevant_docs, elapsed = time_call(
+                retriever._select_relevant_parts,
+                query,
+                relevant_articles,
+                3,
+                article_scores,
+                query_embedding,
+            )
+            timings["select_relevant_parts"].append(elapsed)
+
+            _, elapsed = time_call(generator._prepare_prompt, query, relevant_docs)
+            timings["prompt_assembly"].append(elapsed)
+
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(results, baseline, max_regression):
+    # Stages whose median is more than max_regression percent slower than the baseline
+    regressions = {}
+    for stage, stats in results["stages"].items():
+        baseline_stats = baseline.get("stages", {}).get(stage)
+        if not baseline_stats or baseline_stats["p50_ms"] <= 0:
+            continue
+        change = (stats["p50_ms"] / baseline_stats["p50_ms"] - 1) * 100
+        if change > max_regression:
+            regressions[stage] = {
+                "baseline_p50_ms": baseline_stats["p50_ms"],
+                "p50_ms": stats["p50_ms"],
+                "change_percent": change,
+            }
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage retrieval pipeline benchmarks")
+    parser.add_argument("--queries", default=QUERIES_PATH)
+    parser.add_argument("--startup-repeats", type=int, default=3)
+    parser.add_argument("--query-repeats", type=int, default=5)
+    parser.add_argument("--vector-backend", choices=["chroma", "flat"], default="chroma")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON results file")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Allowed slowdown per stage in percent")
+    args = parser.parse_args()
+
+    with open(args.queries, "r") as f:
+        queries = json.load(f)
+
+    documents, vector_store, startup_timings = benchmark_startup(
+        args.startup_repeats, args.vector_backend
+    )
+    query_timings = benchmark_queries(documents, vector_store, queries, args.query_repeats)
+
+    results = {
+        "metadata": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "vector_backend": args.vector_backend,
+            "chunks": len(documents),
+            "articles": len(load_article_summaries(constants.SUMMARIES_PATH)),
+            "queries": len(queries),
+        },
+        "stages": {
+            stage: summarize(samples)
+            for stage, samples in {**startup_timings, **query_timings}.items()
+        },
+    }
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        results["regressions"] = find_regressions(results, baseline, args.max_regression)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare search latency of the Chroma and flat NumPy vector store backends.
+
+Run from the repository root:
+
+    python -m benchmarks.vector_store_latency --repeats 50
+"""
+import argparse
+import json
+import statistics
+import time
+
+from src.data_preparation import DataPreparation
+from src.vectorization import FlatVectorStore, SegregatedVectorStore
+
+QUERIES = [
+    ("What is personal data?", None),
+    ("How to obtain valid consent?", ["6", "7", "8"]),
+    ("What are the principles of data processing?", ["5", "6"]),
+    ("Explain the right to erasure", ["17"]),
+    ("Tell me about C-136/17", ["17", "21"]),
+]
+
+
+def time_backend(store, query_embeddings, top_k, repeats):
+    latencies = []
+    for _ in range(repeats):
+        for (query, article_numbers), query_embedding in zip(QUERIES, query_embeddings):
+            start = time.perf_counter()
+            store.search(query, article_numbers=article_numbers, top_k=top_k, query_embedding=query_embedding)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store backend latency comparison")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=60)
+    args = parser.parse_args()
+
+    documents = DataPreparation().prepare_documents()
+
+    start = time.perf_counter()
+    chroma_store = SegregatedVectorStore(documents)
+    chroma_build = time.perf_counter() - start
+    start = time.perf_counter()
+    flat_store = FlatVectorStore(documents, embeddings=chroma_store.embeddings)
+    flat_build = time.perf_counter() - start
+
+    query_embeddings = chroma_store.embeddings.embed_documents([query for query, _ in QUERIES])
+
+    # Fraction of identical (page content) results between the two backends
+    agreement = []
+    for (query, article_numbers), query_embedding in zip(QUERIES, query_embeddings):
+        chroma_results = chroma_store.search(query, article_numbers, args.top_k, query_embedding)
+        flat_results = flat_store.search(query, article_numbers, args.top_k, query_embedding)
+        chroma_texts = {doc.page_content for doc, _ in chroma_results}
+        flat_texts = {doc.page_content for doc, _ in flat_results}
+        agreement.append(len(chroma_texts & flat_texts) / max(len(chroma_texts), 1))
+
+    report = {
+        "chunks": len(documents),
+        "top_k": args.top_k,
+        "chroma": dict(build_s=chroma_build, **time_backend(chroma_store, query_embeddings, args.top_k, args.repeats)),
+        "flat": dict(build_s=flat_build, **time_backend(flat_store, query_embeddings, args.top_k, args.repeats)),
+        "result_agreement": statistics.fmean(agreement),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
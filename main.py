@@ -4,10 +4,9 @@ import logging
 import os
 import warnings
 import argparse
-from src.data_preparation import DataPreparation
-from src.rag_model import RAGModel
-from src.console_interface import run_console_interface
-from src.vectorization import SegregatedVectorStore
+from functools import partial
+from src.instrumentation import JsonLinesExporter, LogExporter, tracer
+from src import constants
 
 src_dir = Path(__file__).resolve().parent / "src"
 sys.path.append(str(src_dir))
@@ -24,18 +23,264 @@ for logger_name in ["httpx", "sentence_transformers", "chromadb"]:
     logging.getLogger(logger_name).setLevel(logging.ERROR)
 
 
+def add_pipeline_arguments(parser):
+    # Arguments shared by the console and the HTTP server entry points
+    parser.add_argument(
+        "--persistent-index",
+        action="store_true",
+        help=f"Persist the vector index under {constants.VECTORSTORE_DIR} and reuse it on later runs",
+    )
+    parser.add_argument(
+        "--incremental-index",
+        action="store_true",
+        help="Like --persistent-index, but only re-embed the articles whose text changed",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Reuse prepared documents from --snapshot-path instead of parsing the PDF again",
+    )
+    parser.add_argument("--snapshot-path", default=constants.DOCUMENTS_SNAPSHOT_PATH, help="Prepared documents snapshot file")
+    parser.add_argument(
+        "--embedding-cache",
+        action="store_true",
+        help="Reuse chunk embeddings from --embedding-cache-path when building the index",
+    )
+    parser.add_argument("--embedding-cache-path", default=constants.EMBEDDING_CACHE_PATH, help="SQLite chunk embedding cache")
+    parser.add_argument(
+        "--vector-backend",
+        choices=["chroma", "flat"],
+        default="chroma",
+        help="Per-article Chroma collections or one flat NumPy chunk matrix",
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=["none", "int8"],
+        default="none",
+        help="Flat backend: int8 scalar quantization, with exact rescoring from full-precision vectors on disk",
+    )
+    parser.add_argument("--pca-dimensions", type=int, default=None, help="Flat backend: reduce embeddings with PCA")
+    parser.add_argument(
+        "--search-mode",
+        choices=["dense", "hybrid"],
+        default="dense",
+        help="Dense chunk search, or dense fused with BM25 by reciprocal rank fusion",
+    )
+    parser.add_argument(
+        "--rerank",
+        action="store_true",
+        help=f"Rerank the top retrieved chunks with the {constants.RERANKER_MODEL} cross-encoder",
+    )
+    parser.add_argument("--rerank-candidates", type=int, default=constants.RERANK_CANDIDATES, help="Chunks scored by the reranker")
+    parser.add_argument(
+        "--rerank-budget-ms",
+        type=float,
+        default=constants.RERANK_LATENCY_BUDGET_MS,
+        help="Keep the first-stage order when reranking would take longer than this",
+    )
+    parser.add_argument(
+        "--pdf-path",
+        default=constants.PDF_PATH,
+        help="PDF file, or a directory of PDFs with --streaming-ingestion",
+    )
+    parser.add_argument(
+        "--streaming-ingestion",
+        action="store_true",
+        help="Stream pages through a process pool instead of loading the whole PDF first",
+    )
+    parser.add_argument("--ingestion-workers", type=int, default=None, help="Worker processes for streaming ingestion")
+    parser.add_argument("--page-window", type=int, default=64, help="Maximum pages in flight during streaming ingestion")
+    parser.add_argument(
+        "--llm-backend",
+        choices=["openai", "stub"],
+        default="openai",
+        help="OpenAI, or a deterministic offline stub for benchmarking",
+    )
+    parser.add_argument("--stub-latency", type=float, default=constants.STUB_LLM_LATENCY, help="Stub time to first token in seconds")
+    parser.add_argument(
+        "--stub-tokens-per-second",
+        type=float,
+        default=constants.STUB_LLM_TOKENS_PER_SECOND,
+        help="Stub generation speed",
+    )
+    parser.add_argument("--trace-log", action="store_true", help="Log per-stage timings and counters")
+    parser.add_argument("--trace-jsonl", default=None, help="Append per-stage timings and counters to this JSON lines file")
+    parser.add_argument("--answer-cache", action="store_true", help="Cache answers for repeated and near-duplicate questions")
+    parser.add_argument(
+        "--answer-cache-path",
+        default=None,
+        help=f"Persist the answer cache on disk (e.g. {constants.ANSWER_CACHE_PATH}); implies --answer-cache",
+    )
+
+
+def validate_pipeline_arguments(parser, args):
+    if (args.persistent_index or args.incremental_index) and args.vector_backend != "chroma":
+        parser.error("--persistent-index and --incremental-index are only supported by the chroma backend")
+    if (args.quantization != "none" or args.pca_dimensions) and args.vector_backend != "flat":
+        parser.error("--quantization and --pca-dimensions are only supported by the flat backend")
+
+
+def configure_tracing(args, exporters=()):
+    # Tracing stays disabled (near zero overhead) unless an exporter is requested
+    exporters = list(exporters)
+    if args.trace_log:
+        exporters.append(LogExporter())
+    if args.trace_jsonl:
+        exporters.append(JsonLinesExporter(args.trace_jsonl))
+    tracer.configure(exporters, enabled=bool(exporters))
+
+
+def create_llm_backend(args):
+    from src.llm_backends import create_backend
+
+    if args.llm_backend == "stub":
+        return create_backend(
+            "stub", latency=args.stub_latency, tokens_per_second=args.stub_tokens_per_second
+        )
+    return create_backend(args.llm_backend)
+
+
+def prepare_documents(args):
+    # Parse and chunk the PDF; the PDF and text splitting libraries are only imported here
+    from src.data_preparation import DataPreparation
+
+    data_preparation = DataPreparation()
+    if args.streaming_ingestion:
+        return data_preparation.prepare_documents_streaming(
+            args.pdf_path, page_window=args.page_window, workers=args.ingestion_workers
+        )
+    return data_preparation.prepare_documents(args.pdf_path)
+
+
+def load_documents(args, fingerprint):
+    # Prepared documents from the snapshot when it matches the fingerprint, else from the PDF
+    from src.data_loading import load_documents_snapshot, save_documents_snapshot
+
+    if args.snapshot:
+        documents = load_documents_snapshot(args.snapshot_path, fingerprint)
+        if documents is not None:
+            logging.getLogger(__name__).info(f"Loaded {len(documents)} documents from snapshot")
+            return documents
+    documents = prepare_documents(args)
+    if args.snapshot:
+        save_documents_snapshot(args.snapshot_path, documents, fingerprint)
+    return documents
+
+
+def create_embedding_cache(args):
+    from src.embedding_cache import EmbeddingCache
+
+    return EmbeddingCache(args.embedding_cache_path) if args.embedding_cache else None
+
+
+def load_incremental_index(args, embedding_cache=None):
+    # Persisted Chroma index updated in place for the articles that changed
+    from src.data_preparation import DataPreparation, create_text_splitter
+    from src.vectorization import SegregatedVectorStore, compute_settings_fingerprint
+
+    data_preparation = DataPreparation()
+    return SegregatedVectorStore.load_or_update(
+        partial(
+            data_preparation.prepare_articles,
+            args.pdf_path,
+            streaming=args.streaming_ingestion,
+            page_window=args.page_window,
+            workers=args.ingestion_workers,
+        ),
+        partial(
+            data_preparation.article_documents,
+            text_splitter=create_text_splitter(
+                constants.DEFAULT_CHUNK_SIZE, constants.DEFAULT_CHUNK_OVERLAP
+            ),
+            chunk_overlap=constants.DEFAULT_CHUNK_OVERLAP,
+        ),
+        compute_settings_fingerprint(),
+        search_mode=args.search_mode,
+        embedding_cache=embedding_cache,
+    )
+
+
+def load_pipeline(args):
+    # Prepare documents, the vector store and the RAG model; returns (rag_model, documents).
+    # Heavy modules are imported here rather than at module level to keep startup fast
+    from src.answer_cache import AnswerCache
+    from src.embeddings import resident_memory_mb
+    from src.rag_model import RAGModel
+    from src.vectorization import FlatVectorStore, SegregatedVectorStore, compute_index_fingerprint
+
+    fingerprint = compute_index_fingerprint(args.pdf_path)
+    embedding_cache = create_embedding_cache(args)
+    if args.incremental_index:
+        segregated_vector_store, documents = load_incremental_index(args, embedding_cache)
+    elif args.persistent_index:
+        segregated_vector_store, documents = SegregatedVectorStore.load_or_build(
+            partial(load_documents, args, fingerprint),
+            fingerprint,
+            search_mode=args.search_mode,
+            embedding_cache=embedding_cache,
+        )
+    else:
+        documents = load_documents(args, fingerprint)
+        if args.vector_backend == "flat":
+            segregated_vector_store = FlatVectorStore(
+                documents,
+                search_mode=args.search_mode,
+                quantization=None if args.quantization == "none" else args.quantization,
+                pca_dimensions=args.pca_dimensions,
+                embedding_cache=embedding_cache,
+            )
+        else:
+            segregated_vector_store = SegregatedVectorStore(
+                documents, search_mode=args.search_mode, embedding_cache=embedding_cache
+            )
+
+    answer_cache = None
+    if args.answer_cache or args.answer_cache_path:
+        answer_cache = AnswerCache(path=args.answer_cache_path, fingerprint=fingerprint)
+    reranker = None
+    if args.rerank:
+        from src.reranker import CrossEncoderReranker
+
+        reranker = CrossEncoderReranker(
+            candidate_cap=args.rerank_candidates, latency_budget_ms=args.rerank_budget_ms
+        )
+    rag_model = RAGModel(
+        segregated_vector_store,
+        backend=create_llm_backend(args),
+        answer_cache=answer_cache,
+        reranker=reranker,
+    )
+    # Build the article metadata index and load the reranker at startup rather
+    # than on the first query
+    rag_model.retriever.get_article_index(documents)
+    if reranker is not None:
+        reranker.warm_up()
+    logging.getLogger(__name__).info(f"Resident memory after startup: {resident_memory_mb():.0f} MiB")
+    return rag_model, documents
+
+
 def main():
     parser = argparse.ArgumentParser(description="GDPR Articles RAG System")
     parser.add_argument("--hide-documents", action="store_true", help="Hide relevant documents, show only answers")
+    parser.add_argument("--no-stream", action="store_true", help="Print the answer only once it is complete")
+    add_pipeline_arguments(parser)
     args = parser.parse_args()
+    validate_pipeline_arguments(parser, args)
+    configure_tracing(args)
 
-    data_preparation = DataPreparation()
-    documents = data_preparation.prepare_documents()
-    segregated_vector_store = SegregatedVectorStore(documents)
-    rag_model = RAGModel(segregated_vector_store)
+    rag_model, documents = load_pipeline(args)
+
+    from src.console_interface import run_console_interface
 
-    run_console_interface(rag_model, documents, hide_documents=args.hide_documents)
+    try:
+        run_console_interface(
+            rag_model, documents, hide_documents=args.hide_documents, stream=not args.no_stream
+        )
+    finally:
+        if rag_model.answer_cache is not None:
+            logging.getLogger(__name__).info(f"Answer cache: {rag_model.answer_cache.stats()}")
+            rag_model.answer_cache.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
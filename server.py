@@ -0,0 +1,33 @@
+import argparse
+from functools import partial
+from main import add_pipeline_arguments, configure_tracing, load_pipeline, validate_pipeline_arguments
+from src.instrumentation import PrometheusExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GDPR Articles RAG HTTP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--retrieval-workers", type=int, default=4, help="Threads for CPU-bound retrieval")
+    parser.add_argument("--metrics", action="store_true", help="Expose Prometheus-style metrics on /metrics")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    validate_pipeline_arguments(parser, args)
+
+    # The web stack is only imported once the arguments are valid
+    import uvicorn
+    from src.server import create_app
+
+    metrics_exporter = PrometheusExporter() if args.metrics else None
+    configure_tracing(args, [metrics_exporter] if metrics_exporter else [])
+
+    app = create_app(
+        partial(load_pipeline, args),
+        retrieval_workers=args.retrieval_workers,
+        metrics_exporter=metrics_exporter,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
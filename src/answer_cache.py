@@ -0,0 +1,210 @@
+import re
+import shelve
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src import constants
+from src.data_loading import normalize_rows
+from src.instrumentation import tracer
+
+FINGERPRINT_KEY = "__fingerprint__"
+WHITESPACE_PATTERN = re.compile(r"\s+")
+TRAILING_PUNCTUATION_PATTERN = re.compile(r"[\s?!.]+$")
+# Article numbers, dates and legal references such as 2016/679
+NUMBER_PATTERN = re.compile(r"\d+(?:[-/.]\d+)*")
+
+
+def normalize_query(query):
+    # Case, whitespace and trailing punctuation do not change the question
+    query = WHITESPACE_PATTERN.sub(" ", query.strip().lower())
+    return TRAILING_PUNCTUATION_PATTERN.sub("", query)
+
+
+def query_numbers(query):
+    # Numbers named in a query; "Article 15" and "Article 16" embed almost
+    # identically, so a semantic match also requires the same numbers
+    return tuple(sorted(set(NUMBER_PATTERN.findall(query))))
+
+
+class AnswerCache:
+    # Cache of (answer, relevant_docs, article_scores) keyed by normalized query
+    # text, with a fallback to near-duplicate queries, by embedding similarity,
+    # that name the same numbers
+    def __init__(
+        self,
+        similarity_threshold=constants.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        max_entries=constants.ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=constants.ANSWER_CACHE_TTL_SECONDS,
+        path=None,
+        fingerprint=None,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.fingerprint = fingerprint
+        self.entries = OrderedDict()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        # Cached query keys and embedding matrix per tuple of query numbers
+        self._matrices = None
+
+        # Optional on-disk backend; entries from another index fingerprint are dropped
+        self._shelf = None
+        if path is not None:
+            self._shelf = shelve.open(path)
+            if self._shelf.get(FINGERPRINT_KEY) != fingerprint:
+                self._shelf.clear()
+                self._shelf[FINGERPRINT_KEY] = fingerprint
+            stored = [
+                (key, entry) for key, entry in self._shelf.items() if key != FINGERPRINT_KEY
+            ]
+            for key, entry in sorted(stored, key=lambda item: item[1]["created_at"]):
+                self.entries[key] = entry
+            self._remove([key for key, entry in self.entries.items() if self._expired(entry)])
+            self._evict()
+
+    def get(self, query, embed_query=None):
+        # Return (cached value or None, query embedding or None). The query is only
+        # embedded (via embed_query) when there is no exact match
+        if embed_query is None:
+            return self.get_many([query])[0]
+        return self.get_many([query], lambda queries: [embed_query(queries[0])])[0]
+
+    def get_many(self, queries, embed_queries=None):
+        # get for a batch of queries: the queries without an exact match are
+        # embedded in a single embed_queries call (e.g. embed_documents)
+        keys = [normalize_query(query) for query in queries]
+        results = [(None, None)] * len(keys)
+        missing = []
+        with self._lock:
+            for position, key in enumerate(keys):
+                if key in self.entries and self._expired(self.entries[key]):
+                    self._remove([key])
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    self.exact_hits += 1
+                    tracer.count("answer_cache.exact_hits")
+                    results[position] = (self.entries[key]["value"], None)
+                else:
+                    missing.append(position)
+        if not missing:
+            return results
+
+        if embed_queries is None:
+            with self._lock:
+                self.misses += len(missing)
+                tracer.count("answer_cache.misses", len(missing))
+            return results
+
+        query_embeddings = embed_queries([queries[position] for position in missing])
+        with self._lock:
+            for position, query_embedding in zip(missing, query_embeddings):
+                match = self._find_similar(keys[position], query_embedding)
+                if match is not None and self._expired(self.entries[match]):
+                    self._remove([match])
+                    match = None
+                if match is not None:
+                    self.entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    tracer.count("answer_cache.semantic_hits")
+                    results[position] = (self.entries[match]["value"], query_embedding)
+                else:
+                    self.misses += 1
+                    tracer.count("answer_cache.misses")
+                    results[position] = (None, query_embedding)
+        return results
+
+    def put(self, query, value, query_embedding=None):
+        key = normalize_query(query)
+        entry = {
+            "value": value,
+            "vector": None
+            if query_embedding is None
+            else normalize_rows(np.asarray(query_embedding, dtype=np.float32)),
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            if self._shelf is not None:
+                self._shelf[key] = entry
+                self._shelf.sync()
+            self._matrices = None
+            self._evict()
+
+    def invalidate(self, fingerprint=None):
+        # Drop every entry, e.g. when the index fingerprint changes
+        with self._lock:
+            self.entries.clear()
+            self.fingerprint = fingerprint
+            self._matrices = None
+            if self._shelf is not None:
+                self._shelf.clear()
+                self._shelf[FINGERPRINT_KEY] = fingerprint
+                self._shelf.sync()
+
+    def stats(self):
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self._shelf is not None:
+            self._shelf.close()
+            self._shelf = None
+
+    def _find_similar(self, key, query_embedding):
+        # Key of the most similar cached query above the threshold, among those
+        # with the same numbers as the (normalized) query key, if any
+        if self._matrices is None:
+            grouped_keys = {}
+            for cached_key, entry in self.entries.items():
+                if entry["vector"] is not None:
+                    grouped_keys.setdefault(query_numbers(cached_key), []).append(cached_key)
+            self._matrices = {
+                numbers: (keys, np.stack([self.entries[k]["vector"] for k in keys]))
+                for numbers, keys in grouped_keys.items()
+            }
+        if query_numbers(key) not in self._matrices:
+            return None
+
+        keys, matrix = self._matrices[query_numbers(key)]
+        query_vector = normalize_rows(np.asarray(query_embedding, dtype=np.float32))
+        similarities = matrix @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            return keys[best]
+        return None
+
+    def _expired(self, entry):
+        if self.ttl_seconds is None:
+            return False
+        return entry["created_at"] < time.time() - self.ttl_seconds
+
+    def _evict(self):
+        # Remove least recently used entries beyond max_entries; entries is kept in
+        # LRU order, so this only touches the evicted entries. Expired entries are
+        # dropped when a lookup finds them
+        removed = []
+        while len(self.entries) > self.max_entries:
+            removed.append(self.entries.popitem(last=False)[0])
+        self._remove(removed)
+
+    def _remove(self, keys):
+        if not keys:
+            return
+        for key in keys:
+            self.entries.pop(key, None)
+        self._matrices = None
+        if self._shelf is not None:
+            for key in keys:
+                self._shelf.pop(key, None)
+            self._shelf.sync()
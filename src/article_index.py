@@ -0,0 +1,105 @@
+import re
+from typing import Any, Dict, List, Set, Tuple
+from langchain_core.documents import Document
+
+ARTICLE_MENTION_PATTERN = re.compile(r"\barticle\s+(\d+)\b", re.IGNORECASE)
+# Keeps identifiers such as c-136/17 or 2016/679 in one token
+TOKEN_PATTERN = re.compile(r"\w+(?:[-/.]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def stem(word: str) -> str:
+    # Light suffix stripping so that plurals and verb forms share an index entry;
+    # query terms and keywords go through the same rules, so consistency matters
+    # more than linguistic accuracy
+    if len(word) <= 3 or any(char.isdigit() for char in word):
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def article_key(fields: Dict[str, Any]) -> str:
+    # Identifies an article from chunk metadata, a prepared article or an article
+    # score: its number, prefixed by its PDF when documents come from several
+    # PDFs (e.g. "guidelines.pdf#5"), so equal numbers in different PDFs differ
+    source = fields.get("source")
+    article_number = str(fields.get("article_number"))
+    return f"{source}#{article_number}" if source else article_number
+
+
+def chunk_key(doc: Document) -> Tuple[str, Any, str]:
+    # Identifies a chunk across backends, which may return different Document objects
+    return (article_key(doc.metadata), doc.metadata.get("page"), doc.page_content)
+
+
+class ArticleIndex:
+    # Article-level metadata built once from the chunk documents: the unique
+    # articles, their chunks, and an inverted index from stemmed keyword terms
+    # to articles, so scoring a query costs O(query terms)
+    def __init__(self, documents: List[Document]):
+        self.document_count = len(documents)
+        self.articles: List[Tuple[Any, str, str]] = []
+        # Source PDF of each article, None for a single PDF
+        self.article_sources: List[Any] = []
+        self.documents_by_article: Dict[str, List[Document]] = {}
+        # Chunk key -> position in documents, the chunk id of retrieval results
+        self.chunk_ids: Dict[Tuple[str, Any, str], int] = {}
+        for position, doc in enumerate(documents):
+            self.chunk_ids.setdefault(chunk_key(doc), position)
+            key = article_key(doc.metadata)
+            if key not in self.documents_by_article:
+                self.documents_by_article[key] = []
+                self.articles.append(
+                    (
+                        doc.metadata["article_number"],
+                        doc.metadata["article_summary"],
+                        doc.metadata.get("keywords", ""),
+                    )
+                )
+                self.article_sources.append(doc.metadata.get("source"))
+            self.documents_by_article[key].append(doc)
+
+        # Multi-word keywords are indexed as tuples of stemmed terms
+        self.keyword_index: Dict[Tuple[str, ...], List[int]] = {}
+        for position, (_, _, keywords) in enumerate(self.articles):
+            for keyword in keywords.split(","):
+                terms = tuple(stem(term) for term in tokenize(keyword))
+                if not terms:
+                    continue
+                positions = self.keyword_index.setdefault(terms, [])
+                if position not in positions:
+                    positions.append(position)
+        self.max_keyword_terms = max((len(terms) for terms in self.keyword_index), default=0)
+
+    def keyword_matches(self, query: str) -> Dict[int, List[str]]:
+        # Article position -> matched query terms, one entry per occurrence
+        words = tokenize(query)
+        stems = [stem(word) for word in words]
+        matches: Dict[int, List[str]] = {}
+        for length in range(1, self.max_keyword_terms + 1):
+            for start in range(len(stems) - length + 1):
+                positions = self.keyword_index.get(tuple(stems[start : start + length]))
+                if positions:
+                    matched = " ".join(words[start : start + length])
+                    for position in positions:
+                        matches.setdefault(position, []).append(matched)
+        return matches
+
+    @staticmethod
+    def mentioned_articles(query: str) -> Set[str]:
+        # Article numbers named in the query, e.g. "Article 17"
+        return set(ARTICLE_MENTION_PATTERN.findall(query))
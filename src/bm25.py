@@ -0,0 +1,110 @@
+import re
+from functools import partial
+from typing import Dict, List
+import numpy as np
+from langchain_core.documents import Document
+from src import constants
+from src.article_index import article_key, stem, tokenize
+
+IDENTIFIER_SEPARATOR_PATTERN = re.compile(r"[-/.]")
+
+
+def analyze(text: str, stop_words=frozenset()) -> List[str]:
+    # Same tokens and stems as the article keyword index; legal identifiers such
+    # as 95/46/ec or c-136/17 stay single terms
+    terms = []
+    for token in tokenize(text):
+        if token in stop_words:
+            continue
+        terms.append(stem(token))
+        # 2000/31/ec is also indexed as 2000/31, the form used in questions
+        separators = [m.start() for m in IDENTIFIER_SEPARATOR_PATTERN.finditer(token)]
+        terms.extend(
+            token[:position] for position in separators[1:] if "/" in token[:position]
+        )
+    return terms
+
+
+class BM25Index:
+    # Sparse BM25 index over chunks. Term weights are precomputed into a CSR
+    # matrix, so scoring a query is one sparse matrix-vector product
+    def __init__(
+        self,
+        documents: List[Document],
+        k1: float = constants.BM25_K1,
+        b: float = constants.BM25_B,
+    ):
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, CountVectorizer
+
+        self.documents = list(documents)
+        # Without stop words, rare function words ("does", "say") outweigh exact legal terms
+        stop_words = (
+            frozenset(ENGLISH_STOP_WORDS)
+            | frozenset(constants.custom_stopwords)
+            | frozenset(constants.query_stopwords)
+        )
+        self.vectorizer = CountVectorizer(analyzer=partial(analyze, stop_words=stop_words))
+        term_frequencies = self.vectorizer.fit_transform(
+            [doc.page_content for doc in self.documents]
+        ).tocsr().astype(np.float32)
+
+        document_lengths = np.asarray(term_frequencies.sum(axis=1)).ravel()
+        average_length = document_lengths.mean() if len(document_lengths) else 0.0
+        document_frequencies = np.bincount(
+            term_frequencies.indices, minlength=term_frequencies.shape[1]
+        )
+        idf = np.log(
+            1.0
+            + (len(self.documents) - document_frequencies + 0.5)
+            / (document_frequencies + 0.5)
+        ).astype(np.float32)
+
+        # BM25 weight of every non-zero (chunk, term) entry
+        rows = np.repeat(np.arange(len(self.documents)), np.diff(term_frequencies.indptr))
+        length_norm = k1 * (1.0 - b + b * document_lengths / max(average_length, 1e-9))
+        tf = term_frequencies.data
+        term_frequencies.data = (
+            idf[term_frequencies.indices] * tf * (k1 + 1.0) / (tf + length_norm[rows])
+        ).astype(np.float32)
+        self.weights = term_frequencies
+
+        self.article_rows: Dict[str, np.ndarray] = {}
+        grouped_rows: Dict[str, List[int]] = {}
+        for row, doc in enumerate(self.documents):
+            grouped_rows.setdefault(article_key(doc.metadata), []).append(row)
+        for article_number, article_rows in grouped_rows.items():
+            self.article_rows[article_number] = np.asarray(article_rows, dtype=np.int64)
+
+    def score(self, query: str) -> np.ndarray:
+        # BM25 score of every chunk for the query
+        query_vector = self.vectorizer.transform([query])
+        return np.asarray((self.weights @ query_vector.T).todense()).ravel()
+
+    def search(self, query: str, article_numbers=None, top_k: int = 3):
+        # Top chunks by BM25 as (row, score) pairs; chunks without a matching term are skipped
+        scores = self.score(query)
+        if article_numbers is None:
+            rows = np.arange(len(self.documents))
+        else:
+            selected = [
+                self.article_rows[article_number]
+                for article_number in article_numbers
+                if article_number in self.article_rows
+            ]
+            if not selected:
+                return []
+            rows = np.concatenate(selected)
+        rows = rows[scores[rows] > 0]
+        if len(rows) > top_k:
+            rows = rows[np.argpartition(-scores[rows], top_k - 1)[:top_k]]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        return [(int(row), float(scores[row])) for row in rows]
+
+
+def reciprocal_rank_fusion(rankings, k: int = constants.RRF_K):
+    # Fuse ranked lists of keys into {key: score} with sum(1 / (k + rank))
+    fused = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return fused
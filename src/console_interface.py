@@ -1,4 +1,7 @@
+import asyncio
 from src import constants
+from src.article_index import article_key
+from src.retrieval_result import RetrievedParts
 
 
 def print_retrieved_documents(final_docs, article_scores):
@@ -7,46 +10,64 @@ def print_retrieved_documents(final_docs, article_scores):
         print("No documents retrieved.")
         return
 
+    if not isinstance(final_docs, RetrievedParts):
+        final_docs = RetrievedParts(final_docs)
+    # Parts are grouped by article once, then read by position
+    parts_by_article = final_docs.indices_by_article()
+
     for article in article_scores:
         # Find corresponding document parts for this article
-        relevant_parts = [
-            doc
-            for doc, score in final_docs
-            if doc.metadata.get("article_number") == article["article_number"]
-        ]
+        relevant_parts = parts_by_article.get(article_key(article), [])
 
         if relevant_parts:
-            print(f"\nArticle {article['article_number']}:")
+            print(f"\nArticle {article_key(article)}:")
             print("  Reasons:")
             for reason in article["reasons"]:
                 print(f"    - {reason}")
             print("  Retrieved Document Parts:")
-            for doc in relevant_parts:
+            for position in relevant_parts:
+                doc, score = final_docs[position]
                 page = doc.metadata.get("page", "N/A")
-                score = next((s for d, s in final_docs if d == doc), None)
                 print(f"    Page {page}")
-                if score is not None:
-                    print(f"    Relevance Score: {score:.4f}")
+                print(f"    Relevance Score: {score:.4f}")
                 print(f"    Content preview: {doc.page_content[:100]}...")
             print()
 
 
-def run_console_interface(rag_model, documents, hide_documents=False):
+async def stream_answer(rag_model, query, documents):
+    # Print the answer token by token as it is generated
+    final_docs, article_scores, tokens = await rag_model.astream_answer(query, documents)
+    print("\nAnswer: ", end="", flush=True)
+    async for token in tokens:
+        print(token, end="", flush=True)
+    print()
+    return final_docs, article_scores
+
+
+def run_console_interface(rag_model, documents, hide_documents=False, stream=True):
     # Display welcome message
     print(constants.ascii_art)
 
-    while True:
-        # Get user input
-        query = input("\nEnter your question (or 'quit' to exit): ").strip()
-        if query.lower() == "quit":
-            break
-
-        print("\nSearching for relevant documents...")
-        # Process query and get answer
-        answer, final_docs, article_scores = rag_model.answer_query(query, documents)
-
-        # Display results
-        print(f"\nAnswer: {answer}")
-        if not hide_documents:
-            print_retrieved_documents(final_docs, article_scores)
-        print("=" * 50)
+    # One event loop for the whole session: async clients (e.g. the OpenAI
+    # backend's httpx client) are bound to the loop they were first used on
+    with asyncio.Runner() as runner:
+        while True:
+            # Get user input
+            query = input("\nEnter your question (or 'quit' to exit): ").strip()
+            if query.lower() == "quit":
+                break
+
+            print("\nSearching for relevant documents...")
+            # Process query and display the answer
+            if stream:
+                final_docs, article_scores = runner.run(
+                    stream_answer(rag_model, query, documents)
+                )
+            else:
+                answer, final_docs, article_scores = rag_model.answer_query(query, documents)
+                print(f"\nAnswer: {answer}")
+
+            # Display results
+            if not hide_documents:
+                print_retrieved_documents(final_docs, article_scores)
+            print("=" * 50)
@@ -19,6 +19,9 @@ custom_stopwords = [
     "information",
 ]
 
+# Question words that carry no retrieval signal for BM25
+query_stopwords = ["does", "say", "says", "tell", "explain", "mean", "means", "about"]
+
 EMBEDDINGS_MODEL = "all-MiniLM-L6-v2"
 
 # File paths
@@ -26,12 +29,44 @@ PDF_PATH = "data/gdpr_articles.pdf"
 SUMMARY_EMBEDDINGS_PATH = "data/summary_embeddings.npy"
 SUMMARIES_PATH = "data/articles_summaries.json"
 VECTORSTORE_DIR = "data/vectorstore"
+DOCUMENTS_SNAPSHOT_PATH = "data/documents_snapshot"
+EMBEDDING_CACHE_PATH = "data/embedding_cache.sqlite"
 
 # Constants
 EXPECTED_ARTICLE_COUNT = 21
 DEFAULT_CHUNK_SIZE = 500
 DEFAULT_CHUNK_OVERLAP = 50
 NUMBER_OF_PARTS_TO_RETRIEVE = 60
+EMBEDDING_BATCH_SIZE = 64
+
+# Cross-encoder reranking
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_CANDIDATES = 20
+RERANK_BATCH_SIZE = 16
+RERANK_LATENCY_BUDGET_MS = 250
+RERANK_CACHE_MAX_ENTRIES = 4096
+
+# Context assembly
+CONTEXT_TOKEN_BUDGET = 3000
+MIN_CHUNK_OVERLAP = 10
+
+# Answer cache
+ANSWER_CACHE_PATH = "data/answer_cache"
+ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+ANSWER_CACHE_MAX_ENTRIES = 1024
+ANSWER_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Stub LLM backend
+STUB_LLM_LATENCY = 0.2
+STUB_LLM_TOKENS_PER_SECOND = 50.0
+
+# Compressed flat vector storage: candidates per article shortlisted for exact rescoring
+QUANTIZATION_RESCORE_FACTOR = 4
+
+# Hybrid BM25 + dense search
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
 
 # Scores
 KEYWORD_MATCH_SCORE = 0.3
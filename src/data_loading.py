@@ -1,8 +1,9 @@
+import hashlib
 import json
 import os
 import numpy as np
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List
 
 
 def load_article_summaries(articles_summaries_path):
@@ -10,5 +11,157 @@ def load_article_summaries(articles_summaries_path):
         return json.load(f)
 
 
-def load_summary_embeddings(embeddings_path: Path) -> Dict[str, List[float]]:
+def load_summary_embeddings(embeddings_path: Path) -> Dict[str, Any]:
     return np.load(embeddings_path, allow_pickle=True).item()
+
+
+def save_summary_embeddings(embeddings_path: Path, summary_embeddings: Dict[str, Any]):
+    Path(embeddings_path).parent.mkdir(parents=True, exist_ok=True)
+    np.save(embeddings_path, summary_embeddings, allow_pickle=True)
+
+
+def hash_summaries(article_summaries: Dict[str, str]) -> str:
+    # Stable hash of the summaries file contents, independent of key order
+    payload = json.dumps(article_summaries, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    # L2-normalize each row so that dot products are cosine similarities
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def embed_summaries(embeddings, summaries: List[str]) -> np.ndarray:
+    # Embed all summaries in a single batch and return a normalized float32 matrix
+    if not summaries:
+        return np.empty((0, 0), dtype=np.float32)
+    matrix = np.asarray(embeddings.embed_documents(summaries), dtype=np.float32)
+    return normalize_rows(matrix)
+
+
+def get_summary_embeddings(
+    embeddings,
+    model_name: str,
+    summaries_path: Path,
+    embeddings_path: Path,
+) -> Dict[str, Any]:
+    # Load the stored summary embedding matrix, rebuilding it when the summaries
+    # file or the embedding model no longer match the stored version
+    article_summaries = load_article_summaries(summaries_path)
+    summaries_hash = hash_summaries(article_summaries)
+
+    if os.path.exists(embeddings_path):
+        stored = load_summary_embeddings(embeddings_path)
+        if (
+            stored.get("model_name") == model_name
+            and stored.get("summaries_hash") == summaries_hash
+        ):
+            return stored
+
+    article_numbers = list(article_summaries.keys())
+    summaries = [article_summaries[number] for number in article_numbers]
+    summary_embeddings = {
+        "model_name": model_name,
+        "summaries_hash": summaries_hash,
+        "article_numbers": article_numbers,
+        "summaries": summaries,
+        "embeddings": embed_summaries(embeddings, summaries),
+    }
+    save_summary_embeddings(embeddings_path, summary_embeddings)
+    return summary_embeddings
+
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = "header.json"
+# Chunk-level metadata fields; every other field is stored once per article
+SNAPSHOT_CHUNK_FIELDS = ("page",)
+
+
+def save_documents_snapshot(snapshot_path: Path, documents, fingerprint: str):
+    # Persist prepared documents in a compact binary layout: chunk text as one
+    # UTF-8 buffer with offsets, and article-level metadata stored once per article
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.mkdir(parents=True, exist_ok=True)
+    header_path = snapshot_path / SNAPSHOT_HEADER
+    # Without a header the snapshot reads as missing, so a partial write is never loaded
+    if header_path.exists():
+        header_path.unlink()
+
+    metadata_keys = []
+    articles = []
+    article_rows = {}
+    chunk_articles = np.empty(len(documents), dtype=np.int32)
+    chunk_pages = np.empty(len(documents), dtype=np.int32)
+    offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+    encoded_chunks = []
+    for position, doc in enumerate(documents):
+        for key in doc.metadata:
+            if key not in metadata_keys:
+                metadata_keys.append(key)
+        article = {
+            key: value for key, value in doc.metadata.items() if key not in SNAPSHOT_CHUNK_FIELDS
+        }
+        article_key = json.dumps(article, sort_keys=True, ensure_ascii=False)
+        if article_key not in article_rows:
+            article_rows[article_key] = len(articles)
+            articles.append(article)
+        chunk_articles[position] = article_rows[article_key]
+        chunk_pages[position] = doc.metadata.get("page", -1)
+
+        encoded = doc.page_content.encode("utf-8")
+        encoded_chunks.append(encoded)
+        offsets[position + 1] = offsets[position] + len(encoded)
+
+    np.save(snapshot_path / "text.npy", np.frombuffer(b"".join(encoded_chunks), dtype=np.uint8))
+    np.save(snapshot_path / "offsets.npy", offsets)
+    np.save(snapshot_path / "articles.npy", chunk_articles)
+    np.save(snapshot_path / "pages.npy", chunk_pages)
+    with open(header_path, "w") as f:
+        json.dump(
+            {
+                "version": SNAPSHOT_VERSION,
+                "fingerprint": fingerprint,
+                "metadata_keys": metadata_keys,
+                "articles": articles,
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+
+def load_documents_snapshot(snapshot_path: Path, fingerprint: str):
+    # Return the snapshot's documents, or None if it is missing or stale
+    header_path = Path(snapshot_path) / SNAPSHOT_HEADER
+    if not header_path.exists():
+        return None
+    with open(header_path, "r") as f:
+        header = json.load(f)
+    if header.get("version") != SNAPSHOT_VERSION or header.get("fingerprint") != fingerprint:
+        return None
+
+    from langchain_core.documents import Document
+
+    # Chunk text is read as one buffer and sliced per chunk
+    text = np.load(Path(snapshot_path) / "text.npy").tobytes()
+    offsets = np.load(Path(snapshot_path) / "offsets.npy").tolist()
+    chunk_articles = np.load(Path(snapshot_path) / "articles.npy").tolist()
+    chunk_pages = np.load(Path(snapshot_path) / "pages.npy").tolist()
+    articles = header["articles"]
+    metadata_keys = header["metadata_keys"]
+
+    documents = []
+    for position, (article_row, page) in enumerate(zip(chunk_articles, chunk_pages)):
+        # Summary and keyword strings are shared between the chunks of an article
+        article = articles[article_row]
+        metadata = {}
+        for key in metadata_keys:
+            if key == "page":
+                if page != -1:
+                    metadata[key] = page
+            elif key in article:
+                metadata[key] = article[key]
+        content = text[offsets[position] : offsets[position + 1]].decode("utf-8")
+        documents.append(Document(page_content=content, metadata=metadata))
+    return documents
@@ -1,14 +1,94 @@
-import fitz
-from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import hashlib
+import json
+from bisect import bisect_right
+from langchain_core.documents import Document
 import re
 import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.article_index import article_key
 from src.data_loading import load_article_summaries
-from src.keywords_extraction import extract_keywords
+from src.keywords_extraction import extract_keywords_batch
 from . import constants
 from tqdm import tqdm
 
 
+def clean_page_text(content, pagination_pattern=constants.PAGINATION_PATTERN):
+    # Remove links, newlines, and pagination from a single page
+    cleaned_content = content.replace(constants.LINK1, "").strip()
+    cleaned_content = cleaned_content.replace(constants.LINK2, "").strip()
+    cleaned_content = cleaned_content.replace("\n", " ").strip()
+    return re.sub(pagination_pattern, "", cleaned_content).strip()
+
+
+def detect_article_start(
+    page_text,
+    pagination_pattern=constants.PAGINATION_PATTERN,
+    article_number_pattern=constants.ARTICLE_NUMBER_PATTERN,
+):
+    # Return the article number if this page opens a new article, else None
+    if pagination_pattern.search(page_text):
+        return None
+    lines = page_text.split("\n")
+    if len(lines) > 1:
+        match = article_number_pattern.match(lines[1])
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def create_text_splitter(chunk_size, chunk_overlap):
+    # The splitter (and fitz below) are imported on use so that loading a
+    # snapshot or the persisted index never imports the PDF and splitting libraries
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""],
+    )
+
+
+def process_page_batch(pdf_path, first_page, last_page):
+    # Worker: extract and clean a range of pages, keeping only what parsing needs
+    import fitz
+
+    processed_pages = []
+    with fitz.open(pdf_path) as doc:
+        for page_number in range(first_page, last_page):
+            page_text = doc[page_number].get_text()
+            processed_pages.append(
+                (page_number + 1, detect_article_start(page_text), clean_page_text(page_text))
+            )
+    return processed_pages
+
+
+def hash_article(article):
+    # (text hash, metadata hash) of a prepared article: the text hash covers the
+    # article key and cleaned pages (and so the chunks and their embeddings), the
+    # metadata hash the summary and keywords stored with each chunk
+    text = json.dumps([article_key(article), article["pages"]], ensure_ascii=False)
+    metadata = json.dumps([article["summary"], article["keywords"]], ensure_ascii=False)
+    return (
+        hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        hashlib.sha256(metadata.encode("utf-8")).hexdigest(),
+    )
+
+
+def iter_pdf_paths(path):
+    # A single PDF, or every PDF in a directory in name order
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.lower().endswith(".pdf")
+        )
+    return [path]
+
+
 class DataPreparation:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -18,22 +98,106 @@ class DataPreparation:
 
     def extract_pdf_text(self, pdf_path):
         # Extract text from PDF, returning list of (page_number, text) tuples
+        import fitz
+
         with fitz.open(pdf_path) as doc:
             return [(page.number + 1, page.get_text()) for page in doc]
 
+    def iter_pdf_pages(self, pdf_path):
+        # Lazily yield (page_number, text) tuples without loading the whole PDF
+        import fitz
+
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                yield page.number + 1, page.get_text()
+
+    def iter_processed_pages(self, pdf_path, page_window=64, workers=None):
+        # Yield (page_number, article_start, cleaned_text) in page order; at most
+        # page_window pages are extracted ahead of the consumer
+        import fitz
+
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+
+        if workers == 1:
+            for page_number, page_text in self.iter_pdf_pages(pdf_path):
+                yield (
+                    page_number,
+                    detect_article_start(
+                        page_text, self.pagination_pattern, self.article_number_pattern
+                    ),
+                    clean_page_text(page_text, self.pagination_pattern),
+                )
+            return
+
+        workers = workers or os.cpu_count() or 1
+        batch_size = max(1, page_window // (2 * workers))
+        max_pending = max(1, page_window // batch_size)
+        batch_starts = iter(range(0, page_count, batch_size))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for first_page in batch_starts:
+                pending.append(
+                    executor.submit(
+                        process_page_batch,
+                        pdf_path,
+                        first_page,
+                        min(first_page + batch_size, page_count),
+                    )
+                )
+                if len(pending) >= max_pending:
+                    break
+            while pending:
+                batch = pending.popleft().result()
+                next_start = next(batch_starts, None)
+                if next_start is not None:
+                    pending.append(
+                        executor.submit(
+                            process_page_batch,
+                            pdf_path,
+                            next_start,
+                            min(next_start + batch_size, page_count),
+                        )
+                    )
+                yield from batch
+
+    def iter_articles(self, path, page_window=64, workers=None):
+        # Yield (source, article_number, [(page_number, cleaned_text)]) as soon as
+        # each article is complete, for a single PDF or a directory of PDFs. The
+        # source is the PDF file name when there are several PDFs, else None
+        self.pages_processed = 0
+        pdf_paths = iter_pdf_paths(path)
+        for pdf_path in pdf_paths:
+            source = os.path.basename(pdf_path) if len(pdf_paths) > 1 else None
+            current_article = None
+            current_pages = []
+            for page_number, article_start, content in self.iter_processed_pages(
+                pdf_path, page_window, workers
+            ):
+                self.pages_processed += 1
+                if article_start is not None:
+                    if current_article is not None:
+                        yield source, current_article, current_pages
+                    current_article = article_start
+                    current_pages = []
+                if current_article is not None:
+                    current_pages.append((page_number, content))
+            if current_article is not None:
+                yield source, current_article, current_pages
+
     def parse_articles(self, pages):
         # Parse extracted text into separate articles
         articles = {}
         current_article = None
 
         for page_num, page_text in pages:
-            if not self.pagination_pattern.search(page_text):
-                lines = page_text.split("\n")
-                if len(lines) > 1:
-                    match = self.article_number_pattern.match(lines[1])
-                    if match:
-                        current_article = int(match.group(1))
-                        articles[current_article] = []
+            article_start = detect_article_start(
+                page_text, self.pagination_pattern, self.article_number_pattern
+            )
+            if article_start is not None:
+                current_article = article_start
+                articles[current_article] = []
 
             if current_article is not None:
                 articles[current_article].append((page_num, page_text))
@@ -52,15 +216,47 @@ class DataPreparation:
         for article_number, pages in articles.items():
             cleaned_articles[article_number] = []
             for page_num, content in pages:
-                cleaned_content = content.replace(constants.LINK1, "").strip()
-                cleaned_content = cleaned_content.replace(constants.LINK2, "").strip()
-                cleaned_content = cleaned_content.replace("\n", " ").strip()
-                cleaned_content = re.sub(
-                    self.pagination_pattern, "", cleaned_content
-                ).strip()
+                cleaned_content = clean_page_text(content, self.pagination_pattern)
                 cleaned_articles[article_number].append((page_num, cleaned_content))
         return cleaned_articles
 
+    def split_text_with_offsets(self, text_splitter, text, chunk_overlap):
+        # Split text into (chunk, start offset) pairs; searching forward from the
+        # previous chunk keeps repeated text mapped to the right occurrence
+        chunks = []
+        index = 0
+        previous_chunk_len = 0
+        for chunk in text_splitter.split_text(text):
+            offset = max(0, index + previous_chunk_len - chunk_overlap)
+            start = text.find(chunk, offset)
+            if start == -1:
+                start = text.find(chunk)
+            chunks.append((chunk, start))
+            index = start
+            previous_chunk_len = len(chunk)
+        return chunks
+
+    def chunk_article(self, text_splitter, pages, article_content, chunk_overlap):
+        # Split an article into (chunk, page_number) pairs
+        chunks = self.split_text_with_offsets(text_splitter, article_content, chunk_overlap)
+
+        # Calculate page start positions for chunk mapping
+        cumulative_length = 0
+        page_start_positions = [0]
+        for _, content in pages:
+            cumulative_length += len(content) + 1
+            page_start_positions.append(cumulative_length)
+
+        chunk_pages = []
+        for chunk, chunk_start in chunks:
+            # Map chunk to its corresponding page
+            page_num = min(
+                bisect_right(page_start_positions, chunk_start) - 1,
+                len(pages) - 1,
+            )
+            chunk_pages.append((chunk, pages[page_num][0]))
+        return chunk_pages
+
     def prepare_documents(
         self,
         pdf_path=constants.PDF_PATH,
@@ -70,70 +266,116 @@ class DataPreparation:
     ):
         # Main method to prepare documents for processing
 
-        with tqdm(total=5, desc="Document Preparation") as pbar:
-            pages = self.extract_pdf_text(pdf_path)
-            pbar.update(1)
-            pbar.set_description("Parsing articles")
-            parsed_articles = self.parse_articles(pages)
-            pbar.update(1)
-            pbar.set_description("Cleaning articles")
-            cleaned_articles = self.clean_articles(parsed_articles)
+        with tqdm(total=2, desc="Preparing articles") as pbar:
+            articles = self.prepare_articles(pdf_path, summaries_path)
             pbar.update(1)
-            pbar.set_description("Loading summaries")
-            article_summaries = load_article_summaries(summaries_path)
+
+            pbar.set_description("Processing articles")
+            text_splitter = create_text_splitter(chunk_size, chunk_overlap)
+            documents = [
+                doc
+                for article in tqdm(articles, desc="Articles", leave=False)
+                for doc in self.article_documents(article, text_splitter, chunk_overlap)
+            ]
             pbar.update(1)
 
-            # Initialize text splitter for chunking
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                length_function=len,
-                separators=["\n\n", "\n", " ", ""],
-            )
+        return documents
+
+    def article_documents(self, article, text_splitter, chunk_overlap):
+        # Chunk one prepared article into Documents
+        documents = []
+        for chunk, exact_page in self.chunk_article(
+            text_splitter, article["pages"], article["content"], chunk_overlap
+        ):
+            # Create metadata for the chunk
+            metadata = {
+                "article_number": article["article_number"],
+                "article_summary": article["summary"],
+                "page": exact_page,
+                "keywords": article["keywords"],
+            }
+            if article["source"]:
+                metadata["source"] = article["source"]
+            documents.append(Document(page_content=chunk, metadata=metadata))
+        return documents
 
-            # Prepare all article contents for keyword extraction
-            all_article_contents = [
-                " ".join(content for _, content in pages)
-                for pages in cleaned_articles.values()
+    def prepare_articles(
+        self,
+        path=constants.PDF_PATH,
+        summaries_path=constants.SUMMARIES_PATH,
+        streaming=False,
+        page_window=64,
+        workers=None,
+    ):
+        # Cleaned articles with their summaries and corpus-wide keywords, in document
+        # order and without chunking, as dicts accepted by article_documents.
+        # Summaries are looked up by article key, e.g. "5" or "guidelines.pdf#5"
+        if streaming:
+            raw_articles = list(
+                tqdm(self.iter_articles(path, page_window, workers), desc="Articles")
+            )
+        else:
+            pages = self.extract_pdf_text(path)
+            raw_articles = [
+                (None, article_number, article_pages)
+                for article_number, article_pages in self.clean_articles(
+                    self.parse_articles(pages)
+                ).items()
             ]
+        article_summaries = load_article_summaries(summaries_path)
+        contents = [" ".join(content for _, content in pages) for _, _, pages in raw_articles]
+        all_keywords = extract_keywords_batch(contents)
+        return [
+            {
+                "source": source,
+                "article_number": article_number,
+                "pages": pages,
+                "content": content,
+                "summary": article_summaries.get(
+                    article_key({"source": source, "article_number": article_number}),
+                    "Summary not available",
+                ),
+                "keywords": ", ".join(keywords),
+            }
+            for (source, article_number, pages), content, keywords in zip(
+                raw_articles, contents, all_keywords
+            )
+        ]
 
-            documents = []
-            pbar.set_description("Processing articles")
-            for article_number, pages in tqdm(
-                cleaned_articles.items(), desc="Articles", leave=False
-            ):
-                article_content = " ".join(content for _, content in pages)
-                chunks = text_splitter.split_text(article_content)
-                summary = article_summaries.get(
-                    str(article_number), "Summary not available"
-                )
-                keywords = extract_keywords(article_content, all_article_contents)
-
-                # Calculate page start positions for chunk mapping
-                cumulative_length = 0
-                page_start_positions = [0]
-                for _, content in pages:
-                    cumulative_length += len(content) + 1
-                    page_start_positions.append(cumulative_length)
-
-                for chunk in chunks:
-                    # Map chunk to its corresponding page
-                    chunk_start = article_content.index(chunk)
-                    page_num = 0
-                    for i, pos in enumerate(page_start_positions):
-                        if pos > chunk_start:
-                            page_num = i - 1
-                            break
-                    exact_page = pages[page_num][0]
-
-                    # Create metadata for the chunk
-                    metadata = {
-                        "article_number": article_number,
-                        "article_summary": summary,
-                        "page": exact_page,
-                        "keywords": ", ".join(keywords),
-                    }
-                    documents.append(Document(page_content=chunk, metadata=metadata))
-            pbar.update(1)
+    def prepare_documents_streaming(
+        self,
+        path=constants.PDF_PATH,
+        summaries_path=constants.SUMMARIES_PATH,
+        chunk_size=constants.DEFAULT_CHUNK_SIZE,
+        chunk_overlap=constants.DEFAULT_CHUNK_OVERLAP,
+        page_window=64,
+        workers=None,
+    ):
+        # Variant of prepare_documents for a directory of PDFs: pages are extracted
+        # and cleaned in a process pool with at most page_window raw pages in
+        # flight. The cleaned articles and the returned documents still cover the
+        # whole corpus, since keywords need corpus-wide TF-IDF statistics
+        start_time = time.perf_counter()
+        articles = self.prepare_articles(
+            path, summaries_path, streaming=True, page_window=page_window, workers=workers
+        )
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
+        documents = [
+            doc
+            for article in articles
+            for doc in self.article_documents(article, text_splitter, chunk_overlap)
+        ]
 
+        elapsed = time.perf_counter() - start_time
+        self.ingestion_stats = {
+            "pages": self.pages_processed,
+            "articles": len(articles),
+            "chunks": len(documents),
+            "seconds": elapsed,
+            "pages_per_second": self.pages_processed / elapsed if elapsed > 0 else 0.0,
+        }
+        self.logger.info(
+            f"Ingested {self.pages_processed} pages in {elapsed:.2f}s "
+            f"({self.ingestion_stats['pages_per_second']:.1f} pages/sec)"
+        )
         return documents
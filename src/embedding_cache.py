@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import numpy as np
+from . import constants
+from .instrumentation import tracer
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_model_name(embeddings):
+    # Cache key component identifying the model that produced a vector
+    return getattr(embeddings, "model_name", None) or type(embeddings).__name__
+
+
+class EmbeddingCache:
+    # Content-addressed store of chunk embeddings in SQLite, keyed by
+    # (model name, sha256 of the chunk text). Vectors are float32 blobs
+    def __init__(self, path=constants.EMBEDDING_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self._connection.commit()
+
+    def get_many(self, model_name, text_hashes):
+        # {text_hash: vector} for the hashes that are cached
+        found = {}
+        with self._lock:
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(text_hashes), 500):
+                batch = text_hashes[start:start + 500]
+                rows = self._connection.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN "
+                    f"({', '.join('?' * len(batch))})",
+                    [model_name, *batch],
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, model_name, text_hashes, vectors):
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [
+                    (model_name, text_hash, np.asarray(vector, dtype=np.float32).tobytes())
+                    for text_hash, vector in zip(text_hashes, vectors)
+                ],
+            )
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def embed_texts(texts, embeddings, cache=None, batch_size=constants.EMBEDDING_BATCH_SIZE):
+    # Embed chunk texts for index construction and return (float32 matrix in
+    # texts order, stats). Identical texts are embedded once, cached vectors are
+    # reused, and the rest go through the model in batches of batch_size
+    start = time.perf_counter()
+    text_hashes = [hash_text(text) for text in texts]
+    unique = {}
+    for text_hash, text in zip(text_hashes, texts):
+        unique.setdefault(text_hash, text)
+
+    model_name = embedding_model_name(embeddings)
+    vectors = cache.get_many(model_name, list(unique)) if cache is not None else {}
+    missing = [text_hash for text_hash in unique if text_hash not in vectors]
+
+    with tracer.span("indexing.embed_chunks"):
+        for batch_start in range(0, len(missing), batch_size):
+            batch = missing[batch_start:batch_start + batch_size]
+            batch_vectors = np.asarray(
+                embeddings.embed_documents([unique[text_hash] for text_hash in batch]),
+                dtype=np.float32,
+            )
+            vectors.update(zip(batch, batch_vectors))
+            if cache is not None:
+                cache.put_many(model_name, batch, batch_vectors)
+    tracer.count("indexing.chunks_embedded", len(missing))
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "chunks": len(texts),
+        "unique": len(unique),
+        "cached": len(unique) - len(missing),
+        "embedded": len(missing),
+        "seconds": elapsed,
+        "chunks_per_second": len(texts) / elapsed if elapsed > 0 else 0.0,
+    }
+    logging.getLogger(__name__).info(
+        f"Embedded {stats['chunks']} chunks ({stats['unique']} unique, {stats['cached']} cached) "
+        f"in {elapsed:.2f}s, {stats['chunks_per_second']:.0f} chunks/sec"
+    )
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32), stats
+    return np.stack([vectors[text_hash] for text_hash in text_hashes]), stats
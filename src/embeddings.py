@@ -0,0 +1,24 @@
+import logging
+from functools import lru_cache
+from . import constants
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model_name=constants.EMBEDDINGS_MODEL):
+    # Load each embedding model once per process and share it between components
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name, encode_kwargs={"batch_size": constants.EMBEDDING_BATCH_SIZE}
+    )
+    logging.getLogger(__name__).info(
+        f"Loaded embedding model {model_name}, resident memory {resident_memory_mb():.0f} MiB"
+    )
+    return embeddings
+
+
+def resident_memory_mb():
+    # Resident set size of the current process in MiB
+    import psutil
+
+    return psutil.Process().memory_info().rss / (1024 * 1024)
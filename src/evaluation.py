@@ -0,0 +1,226 @@
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import constants
+from .article_index import article_key
+
+# Retriever attributes that a sweep can vary
+WEIGHT_NAMES = (
+    "summary_similarity_score",
+    "keyword_match_score",
+    "article_mention_score",
+    "parts_to_retrieve",
+)
+
+
+def load_questions(path):
+    # Labeled questions: [{"question": ..., "articles": ["17"], "pages": [116]}];
+    # "pages" is optional and narrows a relevant chunk to those pages. Articles
+    # are article keys, e.g. "guidelines.pdf#17" when indexing several PDFs
+    with open(path, "r") as f:
+        questions = json.load(f)
+    for question in questions:
+        question["articles"] = [str(article) for article in question.get("articles", [])]
+    return questions
+
+
+def validate_questions(questions, documents):
+    # Fail early, with the offending question, on input that scoring cannot use
+    if not questions:
+        raise ValueError("No evaluation questions given")
+    known_articles = {article_key(doc.metadata) for doc in documents}
+    for question in questions:
+        if not question.get("question") or not question.get("articles"):
+            raise ValueError(f"Question needs a 'question' text and labeled 'articles': {question!r}")
+        unknown = [article for article in question["articles"] if article not in known_articles]
+        if unknown:
+            raise ValueError(
+                f"Question {question['question']!r} is labeled with unknown articles {unknown}"
+            )
+
+
+def weight_grid(values_by_name):
+    # Every combination of the given weight values, e.g.
+    # {"keyword_match_score": [0.1, 0.3]} -> [{"keyword_match_score": 0.1}, ...]
+    for name in values_by_name:
+        if name not in WEIGHT_NAMES:
+            raise ValueError(f"Unknown weight {name!r}, expected one of {WEIGHT_NAMES}")
+    values_by_name = {
+        name: [int(value) for value in values] if name == "parts_to_retrieve" else list(values)
+        for name, values in values_by_name.items()
+    }
+    names = list(values_by_name)
+    return [dict(zip(names, values)) for values in itertools.product(*values_by_name.values())]
+
+
+def score_question(question, retrieved, k_values):
+    # recall@k (fraction of expected articles found in the first k chunks) and
+    # reciprocal rank of the first relevant chunk; retrieved is [(article, page)]
+    pages = set(question.get("pages") or [])
+    relevant = [
+        article in question["articles"] and (not pages or page in pages)
+        for article, page in retrieved
+    ]
+    scores = {}
+    for k in k_values:
+        found = {article for (article, _), hit in zip(retrieved[:k], relevant[:k]) if hit}
+        scores[f"recall@{k}"] = len(found) / len(question["articles"])
+    scores["mrr"] = next((1.0 / rank for rank, hit in enumerate(relevant, start=1) if hit), 0.0)
+    return scores
+
+
+def summarize_scores(scores):
+    return {name: float(np.mean([score[name] for score in scores])) for name in scores[0]}
+
+
+class PrecomputedEmbeddings:
+    # Embeddings computed once by the parent process, looked up by text, so
+    # workers and sweep settings do not run the embedding model. A text that was
+    # not precomputed is embedded with the wrapped model (the shared one, loaded
+    # on first use) and kept
+    def __init__(self, vectors_by_text, embeddings=None):
+        self.vectors_by_text = dict(vectors_by_text)
+        self.embeddings = embeddings
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts):
+        missing = list(dict.fromkeys(t for t in texts if t not in self.vectors_by_text))
+        if missing:
+            if self.embeddings is None:
+                from .embeddings import get_embeddings
+
+                self.embeddings = get_embeddings()
+            logging.getLogger(__name__).info(f"Embedding {len(missing)} texts not precomputed")
+            self.vectors_by_text.update(zip(missing, self.embeddings.embed_documents(missing)))
+        return [self.vectors_by_text[text] for text in texts]
+
+
+def prepare_evaluation(questions, documents, embeddings=None, embedding_cache=None, search_mode="dense"):
+    # Everything that needs the embedding model, computed once: chunk vectors
+    # (through the embedding cache), the summary matrix, and the vectors of the
+    # questions and of the document summaries missing from the summary matrix
+    from .data_loading import get_summary_embeddings
+    from .embedding_cache import embed_texts
+    from .embeddings import get_embeddings
+
+    validate_questions(questions, documents)
+    embeddings = embeddings or get_embeddings()
+    chunk_vectors, _ = embed_texts(
+        [doc.page_content for doc in documents], embeddings, embedding_cache
+    )
+    summary_embeddings = get_summary_embeddings(
+        embeddings, constants.EMBEDDINGS_MODEL, constants.SUMMARIES_PATH, constants.SUMMARY_EMBEDDINGS_PATH
+    )
+    stored_summaries = set(summary_embeddings["summaries"])
+    texts = list(
+        dict.fromkeys(
+            [question["question"] for question in questions]
+            + [
+                doc.metadata["article_summary"]
+                for doc in documents
+                if doc.metadata.get("article_summary") not in stored_summaries
+            ]
+        )
+    )
+    text_vectors, _ = embed_texts(texts, embeddings, embedding_cache)
+    return {
+        "documents": documents,
+        "chunk_vectors": chunk_vectors,
+        "text_vectors": dict(zip(texts, text_vectors)),
+        "search_mode": search_mode,
+    }
+
+
+_worker = {}
+
+
+def _init_worker(state):
+    # Build the retriever once per process from the precomputed vectors
+    from .retriever import Retriever
+    from .vectorization import FlatVectorStore
+
+    store = FlatVectorStore(
+        state["documents"],
+        embeddings=PrecomputedEmbeddings(state["text_vectors"]),
+        search_mode=state["search_mode"],
+        vectors=state["chunk_vectors"],
+    )
+    retriever = Retriever(store)
+    _worker["retriever"] = retriever
+    _worker["defaults"] = {name: getattr(retriever, name) for name in WEIGHT_NAMES}
+    _worker["documents"] = state["documents"]
+
+
+def _retrieve(weights, questions, top_k):
+    # Retrieved (article, page) lists for questions under one weight setting
+    retriever = _worker["retriever"]
+    for name, default in _worker["defaults"].items():
+        setattr(retriever, name, weights.get(name, default))
+    results = retriever.get_relevant_documents_batch(
+        [question["question"] for question in questions], _worker["documents"], top_k
+    )
+    return [
+        [(article_key(doc.metadata), doc.metadata.get("page")) for doc, _ in relevant_docs]
+        for relevant_docs, _ in results
+    ]
+
+
+def run_evaluation(state, questions, grid=None, top_k=3, k_values=(1, 3, 5), workers=None):
+    # Evaluate every weight setting of grid (default: the current constants) over
+    # questions, in parallel across processes. Returns queries/sec and one
+    # result (weights, recall@k, MRR) per setting, best MRR first
+    validate_questions(questions, state["documents"])
+    grid = grid or [{}]
+    k_values = [k for k in k_values if k <= top_k] or [top_k]
+    workers = workers or min(os.cpu_count() or 1, 8)
+
+    # One task per setting, or per slice of questions when there is one setting
+    slices = max(1, workers // len(grid))
+    size = -(-len(questions) // slices)
+    tasks = [
+        (setting_index, weights, questions[start:start + size])
+        for setting_index, weights in enumerate(grid)
+        for start in range(0, len(questions), size)
+    ]
+
+    start = time.perf_counter()
+    retrieved = [[] for _ in grid]
+    if workers == 1:
+        _init_worker(state)
+        for setting_index, weights, batch in tasks:
+            retrieved[setting_index].extend(_retrieve(weights, batch, top_k))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(state,)) as executor:
+            futures = [
+                (setting_index, executor.submit(_retrieve, weights, batch, top_k))
+                for setting_index, weights, batch in tasks
+            ]
+            for setting_index, future in futures:
+                retrieved[setting_index].extend(future.result())
+    elapsed = time.perf_counter() - start
+    queries_per_second = len(questions) * len(grid) / elapsed
+    logging.getLogger(__name__).info(
+        f"Evaluated {len(grid)} settings x {len(questions)} questions in {elapsed:.2f}s "
+        f"({queries_per_second:.0f} queries/sec, {workers} workers)"
+    )
+
+    results = []
+    for weights, setting_results in zip(grid, retrieved):
+        metrics = summarize_scores(
+            [score_question(question, found, k_values) for question, found in zip(questions, setting_results)]
+        )
+        results.append({"weights": weights, **metrics})
+    return {
+        "questions": len(questions),
+        "settings": len(grid),
+        "workers": workers,
+        "seconds": elapsed,
+        "queries_per_second": queries_per_second,
+        "results": sorted(results, key=lambda result: result["mrr"], reverse=True),
+    }
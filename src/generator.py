@@ -1,26 +1,127 @@
-import os
-from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from . import constants
-from langchain_openai import OpenAI
+from .article_index import article_key
+from .instrumentation import tracer
+from .llm_backends import OpenAIBackend
 
-load_dotenv()
+_encoding = None
+
+
+def count_tokens(text):
+    # Token count with the OpenAI tokenizer; approximated when it cannot be loaded
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        return max(1, len(text) // 4)
+    return len(_encoding.encode(text))
+
+
+def merge_overlapping(first, second, max_overlap=constants.DEFAULT_CHUNK_OVERLAP):
+    # first + second without the text they share, if the end of first overlaps
+    # the start of second (as adjacent chunks do); None otherwise
+    for size in range(min(max_overlap, len(first), len(second)), constants.MIN_CHUNK_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return None
+
+
+def add_segment(segments, text):
+    # Add a chunk to the text segments of one location, dropping it if it is
+    # already contained and merging it with the segments it overlaps
+    for segment in segments:
+        if text in segment:
+            return
+    for index, segment in enumerate(segments):
+        merged = merge_overlapping(segment, text) or merge_overlapping(text, segment)
+        if merged is not None:
+            del segments[index]
+            add_segment(segments, merged)
+            return
+    segments.append(text)
+
+
+def assemble_context(relevant_docs, token_budget=constants.CONTEXT_TOKEN_BUDGET):
+    # Build the prompt context from (doc, score) pairs in relevance order and
+    # return (context, stats). Chunks are grouped under one [Article | Page]
+    # header per location, with duplicate and overlapping text merged. Chunks
+    # that would take the context over token_budget are left out. Tokens are
+    # counted per location, so stats["tokens"] can differ from the
+    # joined context by about one token per location
+    locations = {}
+    location_tokens = {}
+    tokens = 0
+    stats = {"chunks": len(relevant_docs), "merged": 0, "dropped": 0}
+    for doc, _ in relevant_docs:
+        article = article_key(doc.metadata) if "article_number" in doc.metadata else "Unknown"
+        location = (article, doc.metadata.get("page", "Unknown"))
+        segments = list(locations.get(location, []))
+        add_segment(segments, doc.page_content)
+        if segments == locations.get(location):
+            stats["merged"] += 1
+            continue
+        new_tokens = count_tokens(
+            f"[Article {location[0]} | Page {location[1]}]\n" + "\n".join(segments) + "\n\n"
+        )
+        added_tokens = new_tokens - location_tokens.get(location, 0)
+        if token_budget is not None and tokens + added_tokens > token_budget:
+            stats["dropped"] += 1
+            continue
+        if location in locations:
+            stats["merged"] += 1
+        locations[location] = segments
+        location_tokens[location] = new_tokens
+        tokens += added_tokens
+
+    # One join over all locations instead of repeated string concatenation
+    context = "".join(
+        f"[Article {article_number} | Page {page_number}]\n" + "\n".join(segments) + "\n\n"
+        for (article_number, page_number), segments in locations.items()
+    )
+    stats["tokens"] = tokens
+    return context, stats
 
 
 class Generator:
-    def __init__(self):
-        self.llm = OpenAI(temperature=0.0, openai_api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, backend=None, context_token_budget=constants.CONTEXT_TOKEN_BUDGET):
+        self.backend = backend or OpenAIBackend()
         self.prompt_template = PromptTemplate.from_template(constants.prompt_template)
+        self.context_token_budget = context_token_budget
 
     def generate_answer(self, query, relevant_docs):
-        context = self._prepare_context(relevant_docs)
-        prompt = self.prompt_template.format(context=context, question=query)
-        return self.llm.invoke(prompt)
+        prompt = self._prepare_prompt(query, relevant_docs)
+        with tracer.span("generation.llm"):
+            return self.backend.invoke(prompt)
+
+    async def astream_answer(self, query, relevant_docs):
+        # Yield answer tokens as the backend produces them
+        prompt = self._prepare_prompt(query, relevant_docs)
+        with tracer.span("generation.llm"):
+            async for token in self.backend.astream(prompt):
+                yield token
+
+    async def agenerate_answer(self, query, relevant_docs):
+        return "".join([token async for token in self.astream_answer(query, relevant_docs)])
+
+    def _prepare_prompt(self, query, relevant_docs):
+        with tracer.span("generation.prompt_assembly"):
+            context, stats = assemble_context(relevant_docs, self.context_token_budget)
+            prompt = self.prompt_template.format(context=context, question=query)
+        if tracer.enabled:
+            # The context is already counted; only the template and question are added
+            tracer.count("generation.context_tokens", stats["tokens"])
+            tracer.count("generation.context_chunks_merged", stats["merged"])
+            tracer.count("generation.context_chunks_dropped", stats["dropped"])
+            tracer.count(
+                "generation.prompt_tokens",
+                stats["tokens"] + count_tokens(self.prompt_template.format(context="", question=query)),
+            )
+        return prompt
 
     def _prepare_context(self, relevant_docs):
-        context = ""
-        for doc, score in relevant_docs:
-            article_number = doc.metadata.get("article_number", "Unknown")
-            page_number = doc.metadata.get("page", "Unknown")
-            context += f"[Article {article_number} | Page {page_number}]\n{doc.page_content}\n\n"
-        return context
+        return assemble_context(relevant_docs, self.context_token_budget)[0]
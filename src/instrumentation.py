@@ -0,0 +1,152 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class _NoopSpan:
+    # Shared do-nothing context manager returned while tracing is disabled
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, trace):
+        self.tracer = tracer
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if self.trace is not None:
+            self.trace[self.name] = self.trace.get(self.name, 0.0) + duration * 1000
+        if self.tracer.enabled:
+            for exporter in self.tracer.exporters:
+                exporter.export_span(self.name, duration)
+        return False
+
+
+class Tracer:
+    # Per-stage spans and counters with pluggable exporters. While disabled and
+    # outside of trace(), span() and count() return immediately
+    def __init__(self, exporters=None, enabled=False):
+        self.exporters = list(exporters or [])
+        self.enabled = enabled
+
+    def configure(self, exporters=None, enabled=True):
+        self.exporters = list(exporters or [])
+        self.enabled = enabled
+
+    def span(self, name):
+        trace = _current_trace.get()
+        if not self.enabled and trace is None:
+            return NOOP_SPAN
+        return _Span(self, name, trace)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        for exporter in self.exporters:
+            exporter.export_counter(name, value)
+
+    @contextmanager
+    def trace(self):
+        # Collect span durations (ms, summed by name) for the current context,
+        # even when exporting is disabled
+        timings = {}
+        token = _current_trace.set(timings)
+        try:
+            yield timings
+        finally:
+            _current_trace.reset(token)
+
+
+class LogExporter:
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def export_span(self, name, duration):
+        self.logger.log(self.level, f"span {name}: {duration * 1000:.2f} ms")
+
+    def export_counter(self, name, value):
+        self.logger.log(self.level, f"counter {name}: +{value}")
+
+
+class JsonLinesExporter:
+    def __init__(self, path):
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def _write(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def export_span(self, name, duration):
+        self._write(
+            {"type": "span", "name": name, "duration_ms": duration * 1000, "timestamp": time.time()}
+        )
+
+    def export_counter(self, name, value):
+        self._write({"type": "counter", "name": name, "value": value, "timestamp": time.time()})
+
+    def close(self):
+        self._file.close()
+
+
+class PrometheusExporter:
+    # Aggregates spans and counters and renders them in the Prometheus text format
+    def __init__(self, prefix="gdpr_rag"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.span_counts = defaultdict(int)
+        self.span_seconds = defaultdict(float)
+
+    @staticmethod
+    def _metric_name(name):
+        return name.replace(".", "_").replace("-", "_")
+
+    def export_span(self, name, duration):
+        with self._lock:
+            self.span_counts[name] += 1
+            self.span_seconds[name] += duration
+
+    def export_counter(self, name, value):
+        with self._lock:
+            self.counters[name] += value
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{self._metric_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value:g}")
+            if self.span_counts:
+                metric = f"{self.prefix}_stage_duration_seconds"
+                lines.append(f"# TYPE {metric} summary")
+                for name in sorted(self.span_counts):
+                    label = f'{{stage="{name}"}}'
+                    lines.append(f"{metric}_count{label} {self.span_counts[name]}")
+                    lines.append(f"{metric}_sum{label} {self.span_seconds[name]:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer()
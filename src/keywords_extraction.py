@@ -1,11 +1,20 @@
 from . import constants
-from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 
+TOP_KEYWORDS = 10
+
 
 def extract_keywords(article_content, all_articles):
-    # Extract legal numbers from the article content
-    legal_numbers = find_legislation_numbers(article_content)
+    # Extract keywords for a single article; prefer extract_keywords_batch for a corpus
+    article_index = all_articles.index(article_content)
+    return extract_keywords_batch(all_articles)[article_index]
+
+
+def extract_keywords_batch(all_articles):
+    # Fit TF-IDF once over the corpus and extract keywords for every article
+    if not all_articles:
+        return []
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
     # Create a list of stop words including custom and English stop words
     stop_words = list(constants.custom_stopwords)
@@ -16,22 +25,34 @@ def extract_keywords(article_content, all_articles):
     tfidf_matrix = vectorizer.fit_transform(all_articles)
     feature_names = vectorizer.get_feature_names_out()
 
-    # Get TF-IDF vector for the current article
-    article_index = all_articles.index(article_content)
-    article_vector = tfidf_matrix[article_index].toarray()[0]
-
-    # Calculate c-TF-IDF scores
-    average_tfidf = np.mean(tfidf_matrix.toarray(), axis=0)
-    c_tfidf_scores = article_vector - average_tfidf
-
-    # Extract top keywords based on c-TF-IDF scores
-    top_keywords = sorted(
-        zip(feature_names, c_tfidf_scores), key=lambda x: x[1], reverse=True
-    )[:10]
-    keywords = [word for word, score in top_keywords if score > 0]
-
-    # Combine legal numbers and keywords, removing duplicates
-    return list(dict.fromkeys(legal_numbers + keywords))
+    # c-TF-IDF scores only need the non-zero entries: a term absent from an
+    # article scores -mean <= 0 and is never selected
+    tfidf_matrix = tfidf_matrix.tocsr()
+    average_tfidf = np.asarray(tfidf_matrix.mean(axis=0)).ravel()
+    rows = np.repeat(np.arange(tfidf_matrix.shape[0]), np.diff(tfidf_matrix.indptr))
+    columns = tfidf_matrix.indices
+    c_tfidf_scores = tfidf_matrix.data - average_tfidf[columns]
+
+    # Keep positive scores, ordered by article, then score (descending), then term
+    positive = c_tfidf_scores > 0
+    rows, columns, c_tfidf_scores = rows[positive], columns[positive], c_tfidf_scores[positive]
+    order = np.lexsort((columns, -c_tfidf_scores, rows))
+    rows, columns = rows[order], columns[order]
+
+    # Range of each article in the sorted arrays; the first entries are its top keywords
+    row_starts = np.searchsorted(rows, np.arange(len(all_articles)))
+    row_ends = np.searchsorted(rows, np.arange(len(all_articles)), side="right")
+
+    all_keywords = []
+    for article_content, start, end in zip(all_articles, row_starts, row_ends):
+        # Extract legal numbers from the article content
+        legal_numbers = find_legislation_numbers(article_content)
+        keywords = list(feature_names[columns[start : min(end, start + TOP_KEYWORDS)]])
+
+        # Combine legal numbers and keywords, removing duplicates
+        all_keywords.append(list(dict.fromkeys(legal_numbers + keywords)))
+
+    return all_keywords
 
 
 def find_legislation_numbers(article_content):
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from . import constants
+
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+LOCATION_PATTERN = re.compile(r"\[Article [^|\]]+ \| Page [^\]]+\]")
+
+
+class LLMBackend(ABC):
+    # Interface for text generation backends used by Generator; streaming
+    # defaults to a single token holding the whole invoke result
+    @abstractmethod
+    def invoke(self, prompt):
+        pass
+
+    def stream(self, prompt):
+        yield self.invoke(prompt)
+
+    async def astream(self, prompt):
+        loop = asyncio.get_running_loop()
+        yield await loop.run_in_executor(None, self.invoke, prompt)
+
+    async def ainvoke(self, prompt):
+        return "".join([token async for token in self.astream(prompt)])
+
+
+class LangChainBackend(LLMBackend):
+    # Adapter for any LangChain LLM
+    def __init__(self, llm):
+        self.llm = llm
+
+    def invoke(self, prompt):
+        return self.llm.invoke(prompt)
+
+    def stream(self, prompt):
+        yield from self.llm.stream(prompt)
+
+    async def astream(self, prompt):
+        async for token in self.llm.astream(prompt):
+            yield token
+
+
+class OpenAIBackend(LangChainBackend):
+    def __init__(self, temperature=0.0):
+        from dotenv import load_dotenv
+        from langchain_openai import OpenAI
+
+        load_dotenv()
+        super().__init__(
+            OpenAI(temperature=temperature, openai_api_key=os.getenv("OPENAI_API_KEY"))
+        )
+
+
+class StubBackend(LLMBackend):
+    # Deterministic offline backend with configurable latency and token rate, for
+    # benchmarks and load tests that must not depend on the network
+    def __init__(
+        self,
+        latency=constants.STUB_LLM_LATENCY,
+        tokens_per_second=constants.STUB_LLM_TOKENS_PER_SECOND,
+        response=None,
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response = response
+
+    def generate_text(self, prompt):
+        if self.response is not None:
+            return self.response
+        # Cite the locations given in the prompt so the answer looks like a real one
+        locations = list(dict.fromkeys(LOCATION_PATTERN.findall(prompt)))
+        cited = ", ".join(locations) if locations else "the provided context"
+        return f"This is a stub answer based on {cited}."
+
+    def tokens(self, prompt):
+        return TOKEN_PATTERN.findall(self.generate_text(prompt))
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def invoke(self, prompt):
+        tokens = self.tokens(prompt)
+        time.sleep(self.latency + len(tokens) * self._token_delay())
+        return "".join(tokens)
+
+    def stream(self, prompt):
+        time.sleep(self.latency)
+        for token in self.tokens(prompt):
+            time.sleep(self._token_delay())
+            yield token
+
+    async def astream(self, prompt):
+        await asyncio.sleep(self.latency)
+        for token in self.tokens(prompt):
+            await asyncio.sleep(self._token_delay())
+            yield token
+
+
+def create_backend(name, **kwargs):
+    if name == "openai":
+        return OpenAIBackend(**kwargs)
+    if name == "stub":
+        return StubBackend(**kwargs)
+    raise ValueError(f"Unknown LLM backend: {name}")
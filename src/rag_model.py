@@ -1,15 +1,154 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from .retriever import Retriever
 from .generator import Generator
+from .instrumentation import tracer
 
 
 class RAGModel:
-    def __init__(self, segregated_vector_store):
-        self.retriever = Retriever(segregated_vector_store)
-        self.generator = Generator()
+    def __init__(self, segregated_vector_store, backend=None, answer_cache=None, reranker=None):
+        self.retriever = Retriever(segregated_vector_store, reranker=reranker)
+        self.generator = Generator(backend)
+        self.answer_cache = answer_cache
 
-    def answer_query(self, query, documents):
-        relevant_docs, article_scores = self.retriever.get_relevant_documents(
-            query, documents
+    def answer_query(self, query, documents, return_timings=False):
+        # With return_timings, a dict of per-stage durations (ms) is returned as a
+        # fourth element alongside article_scores
+        if not return_timings:
+            return self._answer_query(query, documents)
+        with tracer.trace() as timings:
+            answer, relevant_docs, article_scores = self._answer_query(query, documents)
+        return answer, relevant_docs, article_scores, timings
+
+    def _answer_query(self, query, documents):
+        tracer.count("rag.queries")
+        with tracer.span("rag.answer_query"):
+            query_embedding = None
+            if self.answer_cache is not None:
+                with tracer.span("rag.cache_lookup"):
+                    cached, query_embedding = self.answer_cache.get(
+                        query, self.retriever.embeddings.embed_query
+                    )
+                if cached is not None:
+                    return cached
+
+            relevant_docs, article_scores = self.retriever.get_relevant_documents(
+                query, documents, query_embedding=query_embedding
+            )
+            answer = self.generator.generate_answer(query, relevant_docs)
+
+            if self.answer_cache is not None:
+                self.answer_cache.put(
+                    query, (answer, relevant_docs, article_scores), query_embedding
+                )
+            return answer, relevant_docs, article_scores
+
+    def answer_queries(self, queries, documents, max_concurrency=4):
+        # Batched cache lookup and retrieval, then generation requests sent
+        # concurrently with a bounded number in flight; results keep the order
+        # of the queries
+        queries = list(queries)
+        tracer.count("rag.queries", len(queries))
+        results = [None] * len(queries)
+        query_embeddings = [None] * len(queries)
+        if self.answer_cache is not None:
+            with tracer.span("rag.cache_lookup"):
+                cached = self.answer_cache.get_many(
+                    queries, self.retriever.embeddings.embed_documents
+                )
+            for position, (value, query_embedding) in enumerate(cached):
+                results[position] = value
+                query_embeddings[position] = query_embedding
+
+        # Cache misses are embedded once, by the cache lookup when there is one
+        missing = [position for position, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        retrievals = self.retriever.get_relevant_documents_batch(
+            [queries[position] for position in missing],
+            documents,
+            query_embeddings=None
+            if self.answer_cache is None
+            else [query_embeddings[position] for position in missing],
+        )
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            answers = list(
+                executor.map(
+                    self.generator.generate_answer,
+                    [queries[position] for position in missing],
+                    [relevant_docs for relevant_docs, _ in retrievals],
+                )
+            )
+
+        for position, answer, (relevant_docs, article_scores) in zip(missing, answers, retrievals):
+            results[position] = (answer, relevant_docs, article_scores)
+            if self.answer_cache is not None:
+                self.answer_cache.put(
+                    queries[position], results[position], query_embeddings[position]
+                )
+        return results
+
+    async def aretrieve(self, query, documents, query_embedding=None):
+        # Retrieval is CPU-bound, so run it in an executor to keep the event loop free;
+        # the context is copied so spans still reach the caller's trace
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            contextvars.copy_context().run,
+            partial(
+                self.retriever.get_relevant_documents,
+                query,
+                documents,
+                query_embedding=query_embedding,
+            ),
+        )
+
+    async def astream_answer(self, query, documents):
+        # Returns the retrieved parts, article scores and an async iterator of answer tokens
+        loop = asyncio.get_running_loop()
+        tracer.count("rag.queries")
+        query_embedding = None
+        if self.answer_cache is not None:
+            cached, query_embedding = await loop.run_in_executor(
+                None,
+                self.answer_cache.get,
+                query,
+                self.retriever.embeddings.embed_query,
+            )
+            if cached is not None:
+                answer, relevant_docs, article_scores = cached
+                return relevant_docs, article_scores, self._replay_tokens(answer)
+
+        relevant_docs, article_scores = await self.aretrieve(
+            query, documents, query_embedding
         )
-        answer = self.generator.generate_answer(query, relevant_docs)
+        tokens = self.generator.astream_answer(query, relevant_docs)
+        if self.answer_cache is not None:
+            tokens = self._cache_streamed_answer(
+                query, tokens, relevant_docs, article_scores, query_embedding
+            )
+        return relevant_docs, article_scores, tokens
+
+    async def aanswer_query(self, query, documents):
+        relevant_docs, article_scores, tokens = await self.astream_answer(query, documents)
+        answer = "".join([token async for token in tokens])
         return answer, relevant_docs, article_scores
+
+    @staticmethod
+    async def _replay_tokens(answer):
+        yield answer
+
+    async def _cache_streamed_answer(
+        self, query, tokens, relevant_docs, article_scores, query_embedding
+    ):
+        # Pass tokens through and cache the answer once the stream completes
+        answer_tokens = []
+        async for token in tokens:
+            answer_tokens.append(token)
+            yield token
+        self.answer_cache.put(
+            query, ("".join(answer_tokens), relevant_docs, article_scores), query_embedding
+        )
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+from . import constants
+from .instrumentation import tracer
+
+
+@lru_cache(maxsize=None)
+def get_cross_encoder(model_name=constants.RERANKER_MODEL):
+    # Load each cross-encoder once per process
+    from sentence_transformers import CrossEncoder
+
+    model = CrossEncoder(model_name)
+    logging.getLogger(__name__).info(f"Loaded reranker model {model_name}")
+    return model
+
+
+class CrossEncoderReranker:
+    # Second retrieval stage: scores (query, chunk) pairs with a local
+    # cross-encoder. At most candidate_cap first-stage candidates are scored, in
+    # batches of batch_size, and scores are cached per (query, chunk text). When
+    # the next batch would exceed latency_budget_ms, scoring stops and the caller
+    # keeps the first-stage order
+    def __init__(
+        self,
+        model=None,
+        model_name=constants.RERANKER_MODEL,
+        candidate_cap=constants.RERANK_CANDIDATES,
+        batch_size=constants.RERANK_BATCH_SIZE,
+        latency_budget_ms=constants.RERANK_LATENCY_BUDGET_MS,
+        max_cache_entries=constants.RERANK_CACHE_MAX_ENTRIES,
+    ):
+        self._model = model
+        self.model_name = model_name
+        self.candidate_cap = candidate_cap
+        self.batch_size = batch_size
+        self.latency_budget_ms = latency_budget_ms
+        self.max_cache_entries = max_cache_entries
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.scored = 0
+        self.fallbacks = 0
+        self._batch_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_cross_encoder(self.model_name)
+        return self._model
+
+    def warm_up(self):
+        # Load the model and time one full batch, so the budget check is
+        # calibrated before the first query
+        start = time.perf_counter()
+        self.model.predict(
+            [("warm up", "warm up")] * self.batch_size,
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        self._batch_seconds = time.perf_counter() - start
+
+    def score(self, query, documents):
+        # Relevance scores of documents (first-stage order, already capped) for
+        # query, or None when the latency budget does not allow scoring them
+        start = time.perf_counter()
+        scores = np.empty(len(documents), dtype=np.float64)
+        missing = []
+        with self._lock:
+            for position, doc in enumerate(documents):
+                key = (query, doc.page_content)
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    scores[position] = self.cache[key]
+                    self.cache_hits += 1
+                else:
+                    missing.append(position)
+        tracer.count("rerank.cache_hits", len(documents) - len(missing))
+
+        for batch_start in range(0, len(missing), self.batch_size):
+            # Stop before a batch that is expected to overrun the budget
+            elapsed = time.perf_counter() - start
+            if (
+                self.latency_budget_ms is not None
+                and (elapsed + self._batch_seconds) * 1000 > self.latency_budget_ms
+            ):
+                self.fallbacks += 1
+                tracer.count("rerank.fallbacks")
+                return None
+            batch = missing[batch_start:batch_start + self.batch_size]
+            batch_start_time = time.perf_counter()
+            batch_scores = self.model.predict(
+                [(query, documents[position].page_content) for position in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            batch_seconds = time.perf_counter() - batch_start_time
+            # Moving average of the time per full batch, for the budget check
+            batch_seconds *= self.batch_size / len(batch)
+            self._batch_seconds = (
+                batch_seconds
+                if not self._batch_seconds
+                else 0.8 * self._batch_seconds + 0.2 * batch_seconds
+            )
+
+            with self._lock:
+                for position, value in zip(batch, batch_scores):
+                    scores[position] = float(value)
+                    self.cache[(query, documents[position].page_content)] = float(value)
+                self.scored += len(batch)
+                while len(self.cache) > self.max_cache_entries:
+                    self.cache.popitem(last=False)
+        return scores
+
+    def stats(self):
+        return {
+            "cache_entries": len(self.cache),
+            "cache_hits": self.cache_hits,
+            "scored": self.scored,
+            "fallbacks": self.fallbacks,
+            "batch_ms": self._batch_seconds * 1000,
+        }
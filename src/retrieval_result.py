@@ -0,0 +1,26 @@
+from typing import Dict, List
+import numpy as np
+from src.article_index import article_key
+
+
+class RetrievedParts(list):
+    # Retrieved (Document, score) pairs, best first, with the chunk id of each part
+    # (its position in the documents list, -1 if unknown), so consumers can group
+    # and look up parts without comparing Documents
+    def __init__(self, parts=(), chunk_ids=None):
+        super().__init__(parts)
+        self.chunk_ids = np.asarray(
+            chunk_ids if chunk_ids is not None else [-1] * len(self), dtype=np.int64
+        )
+
+    @property
+    def article_keys(self) -> List[str]:
+        # Read from the current parts, so it stays correct after the list changes
+        return [article_key(doc.metadata) for doc, _ in self]
+
+    def indices_by_article(self) -> Dict[str, List[int]]:
+        # Article key -> positions of its parts, in rank order
+        grouped: Dict[str, List[int]] = {}
+        for position, key in enumerate(self.article_keys):
+            grouped.setdefault(key, []).append(position)
+        return grouped
@@ -1,34 +1,112 @@
 from typing import List, Tuple, Dict, Any
-from sklearn.metrics.pairwise import cosine_similarity
-from langchain.schema import Document
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.documents import Document
 import numpy as np
 
 from src import constants
+from src.article_index import ArticleIndex, article_key, chunk_key
+from src.data_loading import embed_summaries, get_summary_embeddings, normalize_rows
+from src.instrumentation import tracer
+from src.retrieval_result import RetrievedParts
 from src.vectorization import SegregatedVectorStore
 
 
 class Retriever:
-    def __init__(self, segregated_vector_store: SegregatedVectorStore):
+    def __init__(
+        self, segregated_vector_store: SegregatedVectorStore, embeddings=None, reranker=None
+    ):
         self.segregated_vector_store = segregated_vector_store
-        self.embeddings = HuggingFaceEmbeddings(model_name=constants.EMBEDDINGS_MODEL)
+        # Share the vector store's embedding model instead of loading a second copy
+        self.embeddings = embeddings or segregated_vector_store.embeddings
+        # Optional second stage (CrossEncoderReranker) over the top candidates
+        self.reranker = reranker
+        # Scoring weights; instance attributes so evaluation sweeps can vary them
+        self.summary_similarity_score = constants.SUMMARY_SIMILARITY_SCORE
+        self.keyword_match_score = constants.KEYWORD_MATCH_SCORE
+        self.article_mention_score = constants.ARTICLE_MENTION_SCORE
+        self.parts_to_retrieve = constants.NUMBER_OF_PARTS_TO_RETRIEVE
+
+        # Summary embeddings are computed once and persisted; scoring reuses the matrix
+        summary_embeddings = get_summary_embeddings(
+            self.embeddings,
+            constants.EMBEDDINGS_MODEL,
+            constants.SUMMARIES_PATH,
+            constants.SUMMARY_EMBEDDINGS_PATH,
+        )
+        self.summary_matrix = summary_embeddings["embeddings"]
+        self.summary_rows = {
+            summary: row for row, summary in enumerate(summary_embeddings["summaries"])
+        }
+        self._article_index = None
+        self._article_index_documents = None
+
+    def get_article_index(self, documents: List[Document]) -> ArticleIndex:
+        # Built once per documents list and reused by every query
+        if self._article_index is None or not (
+            self._article_index_documents is documents
+            and self._article_index.document_count == len(documents)
+        ):
+            self._article_index = ArticleIndex(documents)
+            self._article_index_documents = documents
+        return self._article_index
 
     def get_relevant_documents(
-        self, query: str, documents: List[Document], top_k: int = 3
+        self,
+        query: str,
+        documents: List[Document],
+        top_k: int = 3,
+        query_embedding: np.ndarray = None,
     ) -> Tuple[List[Tuple[Document, float]], List[Dict[str, Any]]]:
-        query_embedding = self.embeddings.embed_query(query)
+        if query_embedding is None:
+            with tracer.span("retrieval.embed_query"):
+                query_embedding = self.embeddings.embed_query(query)
+        return self._retrieve(query, query_embedding, documents, top_k)
+
+    def get_relevant_documents_batch(
+        self,
+        queries: List[str],
+        documents: List[Document],
+        top_k: int = 3,
+        query_embeddings: List[np.ndarray] = None,
+    ) -> List[Tuple[List[Tuple[Document, float]], List[Dict[str, Any]]]]:
+        # Embed all queries in one forward pass (unless query_embeddings are given)
+        # and score them against every article summary with a single matrix product
+        queries = list(queries)
+        if not queries:
+            return []
+        if query_embeddings is None:
+            with tracer.span("retrieval.embed_queries"):
+                query_embeddings = self.embeddings.embed_documents(queries)
+        summary_similarities = self._get_summary_similarities(
+            self.get_article_index(documents).articles, query_embeddings
+        )
+
+        return [
+            self._retrieve(
+                query, query_embedding, documents, top_k, summary_similarities[:, i]
+            )
+            for i, (query, query_embedding) in enumerate(zip(queries, query_embeddings))
+        ]
 
+    def _retrieve(
+        self,
+        query: str,
+        query_embedding: np.ndarray,
+        documents: List[Document],
+        top_k: int,
+        summary_similarities: np.ndarray = None,
+    ) -> Tuple[List[Tuple[Document, float]], List[Dict[str, Any]]]:
         relevant_articles, article_scores = self._select_relevant_articles(
-            query, query_embedding, documents, top_k
+            query, query_embedding, documents, top_k, summary_similarities
         )
 
         relevant_docs = self._select_relevant_parts(
-            query, relevant_articles, top_k, article_scores
+            query,
+            relevant_articles,
+            top_k,
+            article_scores,
+            query_embedding,
+            self.get_article_index(documents),
         )
-
-        if not relevant_docs:
-            return [], article_scores
-
         return relevant_docs, article_scores
 
     def _select_relevant_articles(
@@ -37,116 +115,158 @@ class Retriever:
         query_embedding: np.ndarray,
         documents: List[Document],
         top_k: int,
+        summary_similarities: np.ndarray = None,
     ) -> Tuple[List[List[Document]], List[Dict[str, Any]]]:
 
-        scored_articles = self._calculate_article_scores(
-            query, query_embedding, documents
-        )
+        with tracer.span("retrieval.article_scores"):
+            scored_articles = self._calculate_article_scores(
+                query, query_embedding, documents, summary_similarities
+            )
         top_articles = self._get_top_k_items(
             scored_articles, top_k, key=lambda x: x["score"]
         )
 
-        selected_article_numbers = [
-            str(article["article_number"]) for article in top_articles
-        ]
-
+        documents_by_article = self.get_article_index(documents).documents_by_article
         relevant_articles = [
-            [
-                doc
-                for doc in documents
-                if str(doc.metadata["article_number"]) == article_number
-            ]
-            for article_number in selected_article_numbers
+            documents_by_article[article_key(article)] for article in top_articles
         ]
 
         return relevant_articles, top_articles
 
     def _calculate_article_scores(
-        self, query: str, query_embedding: np.ndarray, documents: List[Document]
+        self,
+        query: str,
+        query_embedding: np.ndarray,
+        documents: List[Document],
+        summary_similarities: np.ndarray = None,
     ) -> List[Dict[str, Any]]:
         scored_articles = []
 
-        unique_articles = {
-            (
-                doc.metadata["article_number"],
-                doc.metadata["article_summary"],
-                doc.metadata.get("keywords", ""),
-            )
-            for doc in documents
-        }
+        article_index = self.get_article_index(documents)
+        unique_articles = article_index.articles
+        if summary_similarities is None:
+            summary_similarities = self._get_summary_similarities(
+                unique_articles, [query_embedding]
+            )[:, 0]
 
-        for article_number, summary, keywords in unique_articles:
-            keywords = [k.strip().lower() for k in keywords.split(",") if k.strip()]
+        # Keyword and article mention lookups are done once per query
+        matches_by_article = article_index.keyword_matches(query)
+        mentioned_articles = article_index.mentioned_articles(query)
 
-            summary_embedding = self.embeddings.embed_query(summary)
-            summary_similarity = cosine_similarity(
-                [query_embedding], [summary_embedding]
-            )[0][0]
+        for position, ((article_number, _, _), summary_similarity) in enumerate(
+            zip(unique_articles, summary_similarities)
+        ):
+            summary_similarity = float(summary_similarity)
 
-            score = summary_similarity * constants.SUMMARY_SIMILARITY_SCORE
+            score = summary_similarity * self.summary_similarity_score
             reasons = [f"Query-Summary similarity: {summary_similarity:.2f}"]
 
-            if f"article {article_number}" in query.lower():
-                score += constants.ARTICLE_MENTION_SCORE
+            if str(article_number) in mentioned_articles:
+                score += self.article_mention_score
                 reasons.append(f"Exact article {article_number} mention")
 
-            keyword_matches = []
-            query_words = query.lower().split()
-            for word in query_words:
-                if word in keywords:
-                    score += constants.KEYWORD_MATCH_SCORE
-                    keyword_matches.append(word)
+            keyword_matches = matches_by_article.get(position, [])
+            score += self.keyword_match_score * len(keyword_matches)
             if keyword_matches:
                 reasons.append(f"Keyword matches: {', '.join(keyword_matches)}")
 
-            scored_articles.append(
-                {
-                    "article_number": article_number,
-                    "score": score,
-                    "reasons": reasons,
-                    "summary_similarity": summary_similarity,
-                    "keyword_matches": keyword_matches,
-                }
-            )
+            scored_article = {
+                "article_number": article_number,
+                "score": score,
+                "reasons": reasons,
+                "summary_similarity": summary_similarity,
+                "keyword_matches": keyword_matches,
+            }
+            source = article_index.article_sources[position]
+            if source:
+                scored_article["source"] = source
+            scored_articles.append(scored_article)
 
         return scored_articles
 
+    def _get_summary_similarities(
+        self, unique_articles: List[Tuple[Any, str, str]], query_embeddings
+    ) -> np.ndarray:
+        # Cosine similarity of every article summary to every query, shape (articles, queries)
+        summary_vectors = self._get_summary_vectors(
+            [summary for _, summary, _ in unique_articles]
+        )
+        query_vectors = normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        return summary_vectors @ query_vectors.T
+
+    def _get_summary_vectors(self, summaries: List[str]) -> np.ndarray:
+        # Summaries missing from the stored matrix are embedded once and appended
+        missing = list(dict.fromkeys(s for s in summaries if s not in self.summary_rows))
+        if missing:
+            offset = len(self.summary_matrix)
+            self.summary_matrix = np.vstack(
+                [self.summary_matrix, embed_summaries(self.embeddings, missing)]
+            )
+            for row, summary in enumerate(missing, start=offset):
+                self.summary_rows[summary] = row
+
+        return self.summary_matrix[[self.summary_rows[s] for s in summaries]]
+
     def _select_relevant_parts(
         self,
         query: str,
         relevant_articles: List[List[Document]],
         top_k: int,
         article_scores: List[Dict[str, Any]],
-    ) -> List[Tuple[Document, float]]:
-        article_numbers = [
-            str(article_list[0].metadata["article_number"])
-            for article_list in relevant_articles
-        ]
-
-        results = self.segregated_vector_store.search(
-            query,
-            article_numbers=article_numbers,
-            top_k=constants.NUMBER_OF_PARTS_TO_RETRIEVE,
-        )
+        query_embedding: np.ndarray = None,
+        article_index: ArticleIndex = None,
+    ) -> RetrievedParts:
+        article_numbers = [article_key(article_list[0].metadata) for article_list in relevant_articles]
 
-        scored_parts = []
-
-        for doc, similarity in results:
-            article_number = str(doc.metadata.get("article_number"))
-            article_score = next(
-                (
-                    a["score"]
-                    for a in article_scores
-                    if str(a["article_number"]) == article_number
-                ),
-                0,
+        with tracer.span("retrieval.vector_search"):
+            results = self.segregated_vector_store.search(
+                query,
+                article_numbers=article_numbers,
+                top_k=self.parts_to_retrieve,
+                query_embedding=query_embedding,
             )
+        tracer.count("retrieval.chunks_scored", len(results))
+        if not results:
+            return RetrievedParts()
+
+        # Combined score = chunk similarity + its article's score, one dict lookup per chunk
+        score_by_article = {article_key(a): a["score"] for a in article_scores}
+        combined_scores = np.fromiter(
+            (
+                similarity + score_by_article.get(article_key(doc.metadata), 0)
+                for doc, similarity in results
+            ),
+            dtype=np.float64,
+            count=len(results),
+        )
+        order = np.argsort(-combined_scores, kind="stable")
 
-            combined_score = similarity + article_score
-            scored_parts.append((doc, combined_score))
+        # Rerank the top candidates; they keep first-stage order if it falls back
+        if self.reranker is not None:
+            candidates = order[: self.reranker.candidate_cap]
+            with tracer.span("retrieval.rerank"):
+                rerank_scores = self.reranker.score(query, [results[i][0] for i in candidates])
+            if rerank_scores is not None:
+                # Cross-encoder logits are mapped linearly onto the candidates'
+                # first-stage score range, so returned scores keep one scale and
+                # stay above the candidates beyond the cap
+                low, high = combined_scores[candidates].min(), combined_scores[candidates].max()
+                spread = rerank_scores.max() - rerank_scores.min()
+                if spread > 0:
+                    scaled = (rerank_scores - rerank_scores.min()) / spread
+                    combined_scores[candidates] = low + scaled * (high - low)
+                # Candidates beyond the cap keep their first-stage order after the reranked ones
+                order = np.concatenate(
+                    [candidates[np.argsort(-rerank_scores, kind="stable")], order[len(candidates):]]
+                )
+        order = order[:top_k]
 
-        selected_parts = self._get_top_k_items(scored_parts, top_k, key=lambda x: x[1])
-        return selected_parts
+        chunk_ids = None
+        if article_index is not None:
+            chunk_ids = [article_index.chunk_ids.get(chunk_key(results[i][0]), -1) for i in order]
+        return RetrievedParts(
+            [(results[i][0], float(combined_scores[i])) for i in order], chunk_ids
+        )
 
     @staticmethod
     def _get_top_k_items(items: List[Any], k: int, key: callable) -> List[Any]:
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+
+class QueryRequest(BaseModel):
+    query: str
+    include_documents: bool = True
+
+
+def serialize_result(answer, relevant_docs, article_scores, include_documents=True):
+    result = {
+        "answer": answer,
+        "article_scores": [
+            {
+                "article_number": article["article_number"],
+                "score": float(article["score"]),
+                "reasons": article["reasons"],
+            }
+            for article in article_scores
+        ],
+    }
+    if include_documents:
+        result["documents"] = [
+            {
+                "article_number": doc.metadata.get("article_number"),
+                "page": doc.metadata.get("page"),
+                "score": float(score),
+                "content": doc.page_content,
+            }
+            for doc, score in relevant_docs
+        ]
+    return result
+
+
+def create_app(load_components, retrieval_workers=4, metrics_exporter=None):
+    # load_components() -> (rag_model, documents) runs once, in a worker thread, at
+    # startup; /ready reports whether it has finished
+    logger = logging.getLogger(__name__)
+    state = {"rag_model": None, "documents": None, "error": None}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        loop = asyncio.get_running_loop()
+        # CPU-bound retrieval runs on this pool; generation stays on the event loop
+        executor = ThreadPoolExecutor(
+            max_workers=retrieval_workers, thread_name_prefix="retrieval"
+        )
+        loop.set_default_executor(executor)
+        loading = loop.run_in_executor(executor, load_components)
+
+        def on_loaded(future):
+            if future.exception() is not None:
+                state["error"] = repr(future.exception())
+                logger.error(f"Failed to load RAG components: {state['error']}")
+            else:
+                state["rag_model"], state["documents"] = future.result()
+                logger.info("RAG components loaded, server ready")
+
+        loading.add_done_callback(on_loaded)
+        try:
+            yield
+        finally:
+            if not loading.done():
+                loading.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(title="GDPR Articles RAG System", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready():
+        if state["rag_model"] is None:
+            raise HTTPException(
+                status_code=503,
+                detail=state["error"] or "RAG components are still loading",
+            )
+        return {"ready": True, "documents": len(state["documents"])}
+
+    if metrics_exporter is not None:
+
+        @app.get("/metrics", response_class=PlainTextResponse)
+        async def metrics():
+            return metrics_exporter.render()
+
+    @app.post("/query")
+    async def query(request: QueryRequest):
+        rag_model = state["rag_model"]
+        if rag_model is None:
+            raise HTTPException(status_code=503, detail="RAG components are still loading")
+        if not request.query.strip():
+            raise HTTPException(status_code=422, detail="Query must not be empty")
+
+        answer, relevant_docs, article_scores = await rag_model.aanswer_query(
+            request.query, state["documents"]
+        )
+        return serialize_result(
+            answer, relevant_docs, article_scores, request.include_documents
+        )
+
+    return app
@@ -1,53 +1,654 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+import numpy as np
+from langchain_core.documents import Document
 from . import constants
-from langchain_community.vectorstores import Chroma
+from .article_index import article_key, chunk_key
+from .embedding_cache import embed_texts
+from .embeddings import get_embeddings
 
+FINGERPRINT_FILE = "fingerprint.json"
+CHROMA_SUBDIR = "chroma"
+SEARCH_MODES = ("dense", "hybrid")
+QUANTIZATION_MODES = (None, "int8")
 
-class SegregatedVectorStore:
-    def __init__(self, documents):
-        # Initialize the embedding model
-        self.embeddings = HuggingFaceEmbeddings(model_name=constants.EMBEDDINGS_MODEL)
+
+def compute_index_fingerprint(
+    pdf_path=constants.PDF_PATH,
+    summaries_path=constants.SUMMARIES_PATH,
+    chunk_size=constants.DEFAULT_CHUNK_SIZE,
+    chunk_overlap=constants.DEFAULT_CHUNK_OVERLAP,
+    model_name=constants.EMBEDDINGS_MODEL,
+):
+    # Fingerprint everything that changes the indexed chunks or their vectors
+    from .data_preparation import iter_pdf_paths
+
+    digest = hashlib.sha256()
+    for path in iter_pdf_paths(pdf_path) + [summaries_path]:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    digest.update(f"{chunk_size}|{chunk_overlap}|{model_name}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _delete_collections(client, prefix=""):
+    # Drop a chromadb client's collections whose name starts with prefix
+    for collection in client.list_collections():
+        if collection.name.startswith(prefix):
+            client.delete_collection(collection.name)
+
+
+def distance_to_similarity(squared_distance):
+    # Cosine similarity from a squared L2 distance between unit-norm embeddings;
+    # for other vectors it is still decreasing in distance. search() returns
+    # this score, higher is more similar
+    return 1.0 - squared_distance / 2.0
+
+
+class HybridSearchMixin:
+    # Search mode dispatch shared by the vector store backends: "dense" is the
+    # backend's own vector search, "hybrid" fuses it with BM25 over the same
+    # chunks by reciprocal rank fusion
+    search_mode = "dense"
+    _bm25_index = None
+
+    def _set_search_mode(self, search_mode):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {search_mode!r}, expected one of {SEARCH_MODES}")
+        self.search_mode = search_mode
+
+    @property
+    def bm25_index(self):
+        # Built on first use from the indexed documents
+        if self._bm25_index is None:
+            from .bm25 import BM25Index
+
+            self._bm25_index = BM25Index(self.get_documents())
+        return self._bm25_index
+
+    def search(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        if self.search_mode == "hybrid":
+            return self._hybrid_search(query, article_numbers, top_k, query_embedding)
+        return self._dense_search(query, article_numbers, top_k, query_embedding)
+
+    def _hybrid_search(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        from .bm25 import reciprocal_rank_fusion
+
+        dense_results = sorted(
+            self._dense_candidates(query, article_numbers, top_k, query_embedding),
+            key=lambda x: x[1],
+            reverse=True,
+        )[:top_k]
+        sparse_results = self.bm25_index.search(query, article_numbers, top_k)
+
+        documents = {}
+        dense_keys = []
+        for doc, _ in dense_results:
+            key = chunk_key(doc)
+            documents.setdefault(key, doc)
+            dense_keys.append(key)
+        sparse_keys = []
+        for row, _ in sparse_results:
+            doc = self.bm25_index.documents[row]
+            key = chunk_key(doc)
+            documents.setdefault(key, doc)
+            sparse_keys.append(key)
+
+        fused = reciprocal_rank_fusion([dense_keys, sparse_keys])
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        # Scale to [0, 1] (1 for a chunk ranked first by both lists), the range of
+        # the dense similarities that the article scores are added to
+        max_score = 2.0 / (constants.RRF_K + 1)
+        return [(documents[key], score / max_score) for key, score in ranked]
+
+
+def compute_settings_fingerprint(
+    chunk_size=constants.DEFAULT_CHUNK_SIZE,
+    chunk_overlap=constants.DEFAULT_CHUNK_OVERLAP,
+    model_name=constants.EMBEDDINGS_MODEL,
+):
+    # Fingerprint of the indexing settings only; content changes are tracked per
+    # article by the incremental index
+    settings = f"{chunk_size}|{chunk_overlap}|{model_name}"
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+
+class SegregatedVectorStore(HybridSearchMixin):
+    def __init__(
+        self,
+        documents,
+        persist_directory=None,
+        fingerprint=None,
+        embeddings=None,
+        search_mode="dense",
+        article_hashes=None,
+        embedding_cache=None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self._set_search_mode(search_mode)
+        # Use the shared embedding model unless one is passed in
+        self.embeddings = embeddings or get_embeddings()
+        self.embedding_cache = embedding_cache
         self.article_stores = {}
+        self.persist_directory = persist_directory
+        self.fingerprint = fingerprint
+        self.article_hashes = dict(article_hashes or {})
 
-        # Group documents by article number
-        grouped_docs = {}
-        for doc in documents:
-            article_number = str(
-                doc.metadata.get("article_number")
-            )  # Convert to string
-            if article_number not in grouped_docs:
-                grouped_docs[article_number] = []
-            grouped_docs[article_number].append(doc)
+        chroma_directory = None
+        if persist_directory is not None:
+            chroma_directory = self._chroma_directory(persist_directory, fingerprint)
+            self._remove_stale_indexes(persist_directory, chroma_directory)
+        self.chroma_client = self._chroma_client(chroma_directory)
+        # The in-memory chromadb system is shared by the whole process, so an
+        # in-memory store prefixes its collection names and drops them when freed
+        self.collection_prefix = ""
+        if chroma_directory is None:
+            self.collection_prefix = f"{uuid.uuid4().hex[:12]}_"
+            weakref.finalize(
+                self, _delete_collections, self.chroma_client, self.collection_prefix
+            ).atexit = False
 
-        # Create a Chroma vector store for each article
-        from tqdm import tqdm
+        # Embed the whole corpus in one deduplicated, batched pass
+        vectors, self.embedding_stats = embed_texts(
+            [doc.page_content for doc in documents], self.embeddings, self.embedding_cache
+        )
+
+        # Group documents by article (see article_key; the article number for one PDF)
+        grouped_positions = {}
+        for position, doc in enumerate(documents):
+            grouped_positions.setdefault(article_key(doc.metadata), []).append(position)
 
-        for article_number, docs in tqdm(
-            grouped_docs.items(), desc="Creating vector stores"
-        ):
+        # Create a Chroma vector store for each article
+        for article_number, positions in grouped_positions.items():
             try:
-                self.article_stores[article_number] = Chroma.from_documents(
-                    docs, self.embeddings, collection_name=f"article_{article_number}"
+                self.article_stores[article_number] = self._create_article_store(
+                    article_number,
+                    [documents[position] for position in positions],
+                    vectors[positions],
                 )
             except Exception:
                 raise Exception(
                     f"Failed to create vector store for article {article_number}"
                 )
 
-    def search(self, query, article_numbers=None, top_k=3):
+        if persist_directory is not None:
+            self.save_manifest()
+
+    def save_manifest(self):
+        # Fingerprint, article order and per-article hashes of the persisted index
+        with open(os.path.join(self.persist_directory, FINGERPRINT_FILE), "w") as f:
+            json.dump(
+                {
+                    "fingerprint": self.fingerprint,
+                    "article_numbers": list(self.article_stores.keys()),
+                    "article_hashes": self.article_hashes,
+                },
+                f,
+            )
+
+    def _create_article_store(self, article_number, documents, vectors):
+        # Chroma collection filled with precomputed vectors, bypassing its own
+        # embedding. Ids are chunk positions within the article, on every path
+        self._article_collection(article_number).upsert(
+            ids=[f"{index:08d}" for index in range(len(documents))],
+            embeddings=vectors.tolist(),
+            metadatas=[doc.metadata for doc in documents],
+            documents=[doc.page_content for doc in documents],
+        )
+        return self._open_article_store(article_number)
+
+    def _open_article_store(self, article_number):
+        from langchain_community.vectorstores import Chroma
+
+        return Chroma(
+            client=self.chroma_client,
+            collection_name=self._collection_name(article_number),
+            embedding_function=self.embeddings,
+        )
+
+    def _article_collection(self, article_number):
+        # The chromadb collection behind an article's store, for writes with
+        # precomputed vectors; Chroma's own embedding function is never used
+        return self.chroma_client.get_or_create_collection(
+            self._collection_name(article_number), embedding_function=None
+        )
+
+    def _collection_name(self, article_number):
+        # Chroma names allow only [a-zA-Z0-9._-], so keys with a source PDF are hashed
+        if not article_number.isdigit():
+            article_number = hashlib.sha256(article_number.encode("utf-8")).hexdigest()[:32]
+        return f"{self.collection_prefix}article_{article_number}"
+
+    @staticmethod
+    def _chroma_client(chroma_directory):
+        # One chromadb client per store, persistent when a directory is given
+        import chromadb
+
+        if chroma_directory is None:
+            return chromadb.EphemeralClient()
+        return chromadb.PersistentClient(path=chroma_directory)
+
+    @staticmethod
+    def _chroma_directory(persist_directory, fingerprint):
+        # Each fingerprint gets its own Chroma directory so a rebuild never reuses stale files
+        return os.path.join(persist_directory, f"{CHROMA_SUBDIR}-{(fingerprint or 'default')[:16]}")
+
+    @classmethod
+    def _remove_stale_indexes(cls, persist_directory, chroma_directory):
+        # A full rebuild starts from an empty index. chroma_directory itself may
+        # still hold chunks (e.g. after a lost manifest) that the new build would
+        # not overwrite; its collections are dropped through the client rather
+        # than removing the files, which a client in this process may hold open
+        os.makedirs(persist_directory, exist_ok=True)
+        fingerprint_path = os.path.join(persist_directory, FINGERPRINT_FILE)
+        if os.path.exists(fingerprint_path):
+            os.remove(fingerprint_path)
+        for name in os.listdir(persist_directory):
+            path = os.path.join(persist_directory, name)
+            if name.startswith(CHROMA_SUBDIR) and path != chroma_directory:
+                shutil.rmtree(path, ignore_errors=True)
+        if os.path.isdir(chroma_directory):
+            _delete_collections(cls._chroma_client(chroma_directory))
+
+    @classmethod
+    def load(
+        cls,
+        persist_directory,
+        fingerprint,
+        embeddings=None,
+        search_mode="dense",
+        embedding_cache=None,
+    ):
+        # Load a persisted index, or return None if it is missing or stale
+        fingerprint_path = os.path.join(persist_directory, FINGERPRINT_FILE)
+        if not os.path.exists(fingerprint_path):
+            return None
+        with open(fingerprint_path, "r") as f:
+            stored = json.load(f)
+        if stored.get("fingerprint") != fingerprint:
+            return None
+
+        start = time.perf_counter()
+        store = cls.__new__(cls)
+        store.logger = logging.getLogger(__name__)
+        store._set_search_mode(search_mode)
+        store.embeddings = embeddings or get_embeddings()
+        store.embedding_cache = embedding_cache
+        store.persist_directory = persist_directory
+        store.fingerprint = fingerprint
+        store.article_hashes = {
+            article_number: tuple(hashes)
+            for article_number, hashes in stored.get("article_hashes", {}).items()
+        }
+        store.chroma_client = cls._chroma_client(cls._chroma_directory(persist_directory, fingerprint))
+        store.collection_prefix = ""
+        store.article_stores = {
+            article_number: store._open_article_store(article_number)
+            for article_number in stored["article_numbers"]
+        }
+        store.logger.info(
+            f"Loaded persisted vector index in {time.perf_counter() - start:.2f}s"
+        )
+        return store
+
+    @classmethod
+    def load_or_build(
+        cls,
+        prepare_documents,
+        fingerprint,
+        persist_directory=constants.VECTORSTORE_DIR,
+        search_mode="dense",
+        embedding_cache=None,
+    ):
+        # Warm start from the persisted index; rebuild it when the fingerprint is stale
+        store = cls.load(
+            persist_directory, fingerprint, search_mode=search_mode, embedding_cache=embedding_cache
+        )
+        if store is not None:
+            return store, store.get_documents()
+
+        logging.getLogger(__name__).info("Persisted vector index missing or stale, rebuilding")
+        documents = prepare_documents()
+        store = cls(
+            documents,
+            persist_directory=persist_directory,
+            fingerprint=fingerprint,
+            search_mode=search_mode,
+            embedding_cache=embedding_cache,
+        )
+        return store, documents
+
+    @classmethod
+    def load_or_update(
+        cls,
+        prepare_articles,
+        article_documents,
+        fingerprint,
+        persist_directory=constants.VECTORSTORE_DIR,
+        search_mode="dense",
+        embeddings=None,
+        embedding_cache=None,
+    ):
+        # Incremental variant of load_or_build. prepare_articles() returns the
+        # prepared articles (see DataPreparation.prepare_articles) and
+        # article_documents(article) chunks one of them. Only articles whose text
+        # changed are re-chunked and re-embedded; summary or keyword changes only
+        # rewrite chunk metadata, and unchanged articles are left untouched.
+        # fingerprint covers the indexing settings (compute_settings_fingerprint)
+        from .data_preparation import hash_article
+
+        start = time.perf_counter()
+        articles = prepare_articles()
+        hashes = {article_key(article): hash_article(article) for article in articles}
+        # Collections, hashes and changes are keyed by article (source and number)
+        if len(hashes) != len(articles):
+            raise ValueError("Articles must be unique per PDF to update the index incrementally")
+
+        store = cls.load(persist_directory, fingerprint, embeddings, search_mode, embedding_cache)
+        if store is None:
+            logging.getLogger(__name__).info("Persisted vector index missing or stale, rebuilding")
+            documents = [doc for article in articles for doc in article_documents(article)]
+            store = cls(
+                documents,
+                persist_directory=persist_directory,
+                fingerprint=fingerprint,
+                embeddings=embeddings,
+                search_mode=search_mode,
+                article_hashes=hashes,
+                embedding_cache=embedding_cache,
+            )
+            store.update_stats = {"rebuilt": True, "seconds": time.perf_counter() - start}
+            return store, documents
+
+        stats = {"rebuilt": False, "added": 0, "updated": 0, "metadata_updated": 0, "removed": 0}
+        for article_number in set(store.article_stores) - set(hashes):
+            store.remove_article(article_number)
+            stats["removed"] += 1
+        changed = {}
+        for article in articles:
+            article_number = article_key(article)
+            text_hash, metadata_hash = hashes[article_number]
+            stored_hashes = store.article_hashes.get(article_number)
+            if stored_hashes is None or stored_hashes[0] != text_hash:
+                changed[article_number] = article_documents(article)
+                stats["added" if article_number not in store.article_stores else "updated"] += 1
+            elif stored_hashes[1] != metadata_hash:
+                store.update_article_metadata(
+                    article_number,
+                    {"article_summary": article["summary"], "keywords": article["keywords"]},
+                )
+                stats["metadata_updated"] += 1
+            store.article_hashes[article_number] = (text_hash, metadata_hash)
+
+        # Embed the chunks of every changed article in one batched pass
+        vectors, store.embedding_stats = embed_texts(
+            [doc.page_content for documents in changed.values() for doc in documents],
+            store.embeddings,
+            store.embedding_cache,
+        )
+        offset = 0
+        for article_number, documents in changed.items():
+            store.replace_article(
+                article_number, documents, vectors[offset:offset + len(documents)]
+            )
+            offset += len(documents)
+
+        # Keep the article order of the new corpus
+        store.article_stores = {
+            article_number: store.article_stores[article_number] for article_number in hashes
+        }
+        store.save_manifest()
+        stats["seconds"] = time.perf_counter() - start
+        store.update_stats = stats
+        store._bm25_index = None
+        store.logger.info(f"Incremental index update: {stats}")
+        return store, store.get_documents()
+
+    def replace_article(self, article_number, documents, vectors=None):
+        # Re-index one article's chunks, replacing its previous chunks if any.
+        # vectors are the chunk embeddings, computed here when not given
+        if vectors is None:
+            vectors, self.embedding_stats = embed_texts(
+                [doc.page_content for doc in documents], self.embeddings, self.embedding_cache
+            )
+        article_store = self.article_stores.pop(article_number, None)
+        if article_store is not None:
+            article_store.delete_collection()
+        self.article_stores[article_number] = self._create_article_store(
+            article_number,
+            documents,
+            vectors,
+        )
+
+    def remove_article(self, article_number):
+        self.article_stores.pop(article_number).delete_collection()
+        self.article_hashes.pop(article_number, None)
+
+    def update_article_metadata(self, article_number, updates):
+        # Rewrite article-level metadata of every chunk without re-embedding
+        article_store = self.article_stores[article_number]
+        stored = article_store.get(include=["metadatas"])
+        metadatas = [dict(metadata, **updates) for metadata in stored["metadatas"]]
+        self._article_collection(article_number).update(ids=stored["ids"], metadatas=metadatas)
+
+    def get_documents(self):
+        # Restore the indexed documents in their original order: articles in index
+        # order, chunks by id within each article
+        documents = []
+        for article_store in self.article_stores.values():
+            stored = article_store.get(include=["documents", "metadatas"])
+            documents.extend(
+                Document(page_content=content, metadata=metadata)
+                for _, content, metadata in sorted(
+                    zip(stored["ids"], stored["documents"], stored["metadatas"]),
+                    key=lambda x: x[0],
+                )
+            )
+        return documents
+
+    def _dense_search(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        # Sort results by similarity (descending) and return top k
+        results = self._dense_candidates(query, article_numbers, top_k, query_embedding)
+        return sorted(results, key=lambda x: x[1], reverse=True)[:top_k]
+
+    def _dense_candidates(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        # Top k chunks of each article with their similarity, unsorted across articles
         # If no specific articles are provided, search all articles
         if article_numbers is None:
             article_numbers = list(self.article_stores.keys())
 
+        # Embed the query once and reuse the vector for every article store
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(query)
+        query_embedding = list(map(float, query_embedding))
+
         results = []
         # Search each specified article's vector store
         for article_number in article_numbers:
             if article_number in self.article_stores:
                 article_results = self.article_stores[
                     article_number
-                ].similarity_search_with_score(query, k=top_k)
-                results.extend(article_results)
-
-        # Sort results by score (descending) and return top k
-        results = sorted(results, key=lambda x: x[1], reverse=True)[:top_k]
+                ].similarity_search_by_vector_with_relevance_scores(
+                    query_embedding, k=top_k
+                )
+                # Chroma returns squared L2 distances
+                results.extend(
+                    (doc, distance_to_similarity(distance)) for doc, distance in article_results
+                )
         return results
+
+
+class FlatVectorStore(HybridSearchMixin):
+    # Alternative backend: all chunk embeddings in one contiguous float32 matrix,
+    # with each article's chunks stored in a contiguous row range.
+    # Optionally the in-memory matrix is compressed (PCA to pca_dimensions and/or
+    # int8 scalar quantization); the full-precision vectors are then kept in a
+    # memory-mapped file and used to rescore the top candidates exactly
+    def __init__(
+        self,
+        documents,
+        embeddings=None,
+        search_mode="dense",
+        quantization=None,
+        pca_dimensions=None,
+        vectors=None,
+        vectors_path=None,
+        rescore_factor=constants.QUANTIZATION_RESCORE_FACTOR,
+        embedding_cache=None,
+    ):
+        self.embeddings = embeddings or get_embeddings()
+        self._set_search_mode(search_mode)
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization {quantization!r}, expected one of {QUANTIZATION_MODES}"
+            )
+        self.quantization = quantization
+        self.pca_dimensions = pca_dimensions
+        self.rescore_factor = rescore_factor
+
+        # Order chunks by article so every article maps to a single row range
+        grouped_positions = {}
+        for position, doc in enumerate(documents):
+            grouped_positions.setdefault(article_key(doc.metadata), []).append(
+                position
+            )
+
+        self.documents = []
+        self.article_ranges = {}
+        order = []
+        for article_number, positions in grouped_positions.items():
+            start = len(self.documents)
+            self.documents.extend(documents[position] for position in positions)
+            order.extend(positions)
+            self.article_ranges[article_number] = (start, len(self.documents))
+
+        # Precomputed vectors (in documents order) skip re-embedding
+        self.embedding_stats = None
+        if vectors is None:
+            full_matrix, self.embedding_stats = embed_texts(
+                [doc.page_content for doc in self.documents], self.embeddings, embedding_cache
+            )
+        else:
+            full_matrix = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32)[order])
+
+        self.compressed = quantization is not None or pca_dimensions is not None
+        self.mean = None
+        self.components = None
+        self.scale = None
+        if not self.compressed:
+            self.matrix = full_matrix
+            self.squared_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+            return
+
+        reduced = full_matrix
+        if pca_dimensions is not None:
+            # PCA via SVD of the centered matrix; rows are projected onto the top components
+            self.mean = full_matrix.mean(axis=0)
+            _, _, vt = np.linalg.svd(full_matrix - self.mean, full_matrices=False)
+            self.components = np.ascontiguousarray(vt[:pca_dimensions].T, dtype=np.float32)
+            reduced = (full_matrix - self.mean) @ self.components
+        if quantization == "int8":
+            # Symmetric per-dimension scale so that every dimension uses the full int8 range
+            self.scale = np.abs(reduced).max(axis=0) / 127.0
+            self.scale[self.scale == 0] = 1.0
+            self.matrix = np.round(reduced / self.scale).astype(np.int8)
+            dequantized = self.matrix * self.scale
+        else:
+            self.matrix = np.ascontiguousarray(reduced, dtype=np.float32)
+            dequantized = self.matrix
+        self.squared_norms = np.einsum("ij,ij->i", dequantized, dequantized).astype(np.float32)
+
+        if vectors_path is None:
+            with tempfile.NamedTemporaryFile(suffix=".npy", delete=False) as f:
+                vectors_path = f.name
+            weakref.finalize(self, os.remove, vectors_path)
+        np.save(vectors_path, full_matrix)
+        self.full_vectors = np.load(vectors_path, mmap_mode="r")
+
+    def bytes_per_chunk(self):
+        # In-memory bytes per chunk of the searched matrix and its norms
+        return (self.matrix.nbytes + self.squared_norms.nbytes) / max(len(self.documents), 1)
+
+    def get_documents(self):
+        return list(self.documents)
+
+    def _dense_search(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        rows, distances = self._nearest_rows(query, article_numbers, top_k, query_embedding)
+        # Same contract as SegregatedVectorStore.search: similarity, descending
+        order = np.argsort(distances, kind="stable")[:top_k]
+        return [
+            (self.documents[rows[i]], float(distance_to_similarity(distances[i]))) for i in order
+        ]
+
+    def _dense_candidates(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        rows, distances = self._nearest_rows(query, article_numbers, top_k, query_embedding)
+        return [
+            (self.documents[row], float(distance_to_similarity(distance)))
+            for row, distance in zip(rows, distances)
+        ]
+
+    def _nearest_rows(self, query, article_numbers=None, top_k=3, query_embedding=None):
+        # Rows and squared L2 distances of the top k chunks of each selected article
+        # If no specific articles are provided, search all articles
+        if article_numbers is None:
+            article_numbers = list(self.article_ranges.keys())
+        ranges = [
+            self.article_ranges[article_number]
+            for article_number in article_numbers
+            if article_number in self.article_ranges
+        ]
+        if not ranges:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(query)
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+
+        # One matmul over the rows of the selected articles
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        distances = self._approximate_distances(rows, query_vector)
+
+        # Per-article top k, matching the per-collection queries of SegregatedVectorStore;
+        # compressed stores shortlist more candidates and rescore them exactly
+        candidate_k = top_k * self.rescore_factor if self.compressed else top_k
+        selected_rows = []
+        selected_distances = []
+        offset = 0
+        for start, end in ranges:
+            article_distances = distances[offset : offset + end - start]
+            k = min(candidate_k, len(article_distances))
+            nearest = np.argpartition(article_distances, k - 1)[:k]
+            nearest_distances = article_distances[nearest]
+            if self.compressed:
+                nearest_distances = self._exact_distances(nearest + start, query_vector)
+                k = min(top_k, len(nearest))
+                best = np.argpartition(nearest_distances, k - 1)[:k]
+                nearest, nearest_distances = nearest[best], nearest_distances[best]
+            selected_rows.append(nearest + start)
+            selected_distances.append(nearest_distances)
+            offset += end - start
+        return np.concatenate(selected_rows), np.concatenate(selected_distances)
+
+    def _approximate_distances(self, rows, query_vector):
+        # Squared L2 distances in the stored (possibly reduced and quantized) space
+        if self.mean is not None:
+            query_vector = (query_vector - self.mean) @ self.components
+        if self.scale is not None:
+            # x = codes * scale, so x . q = codes . (scale * q)
+            products = self.matrix[rows] @ (self.scale * query_vector).astype(np.float32)
+        else:
+            products = self.matrix[rows] @ query_vector
+        return self.squared_norms[rows] - 2.0 * products + float(query_vector @ query_vector)
+
+    def _exact_distances(self, rows, query_vector):
+        # Squared L2 distances from the full-precision vectors on disk
+        differences = self.full_vectors[rows] - query_vector
+        return np.einsum("ij,ij->i", differences, differences)
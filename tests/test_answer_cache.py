@@ -0,0 +1,115 @@
+import os
+import tempfile
+import time
+import unittest
+from src.answer_cache import AnswerCache, normalize_query
+from src.data_preparation import DataPreparation
+from src.llm_backends import StubBackend
+from src.rag_model import RAGModel
+from src.vectorization import FlatVectorStore
+
+VECTORS = {
+    "what is consent": [1.0, 0.0, 0.0],
+    "what does consent mean": [0.99, 0.1, 0.0],
+    "right to erasure": [0.0, 1.0, 0.0],
+    "what does article 15 say": [0.0, 0.0, 1.0],
+    "what does article 16 say": [0.0, 0.1, 0.99],
+}
+
+
+def embed_query(query):
+    return VECTORS[normalize_query(query)]
+
+
+class TestAnswerCache(unittest.TestCase):
+    def test_exact_hit_on_normalized_query(self):
+        cache = AnswerCache()
+        self.assertEqual(cache.get("What is consent?", embed_query), (None, VECTORS["what is consent"]))
+        cache.put("What is consent?", "answer", VECTORS["what is consent"])
+        value, query_embedding = cache.get("  what IS consent ", embed_query)
+        self.assertEqual(value, "answer")
+        self.assertIsNone(query_embedding)
+        self.assertEqual(cache.stats()["exact_hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_semantic_hit_above_threshold(self):
+        cache = AnswerCache(similarity_threshold=0.95)
+        cache.put("What is consent?", "answer", VECTORS["what is consent"])
+        self.assertEqual(cache.get("What does consent mean?", embed_query)[0], "answer")
+        self.assertIsNone(cache.get("Right to erasure", embed_query)[0])
+        self.assertEqual(cache.stats()["semantic_hits"], 1)
+
+    def test_semantic_hit_requires_same_numbers(self):
+        cache = AnswerCache(similarity_threshold=0.95)
+        cache.put("What does Article 15 say?", "article 15", VECTORS["what does article 15 say"])
+        self.assertIsNone(cache.get("What does Article 16 say?", embed_query)[0])
+        self.assertEqual(cache.get("What does article 15 say", embed_query)[0], "article 15")
+
+    def test_get_many_embeds_misses_in_one_call(self):
+        cache = AnswerCache(similarity_threshold=0.95)
+        cache.put("What is consent?", "answer", VECTORS["what is consent"])
+        batches = []
+
+        def embed_queries(queries):
+            batches.append(list(queries))
+            return [embed_query(query) for query in queries]
+
+        results = cache.get_many(
+            ["What is consent?", "What does consent mean?", "Right to erasure"], embed_queries
+        )
+        self.assertEqual([value for value, _ in results], ["answer", "answer", None])
+        self.assertEqual(batches, [["What does consent mean?", "Right to erasure"]])
+        self.assertEqual(results[2][1], VECTORS["right to erasure"])
+
+    def test_lru_and_ttl_eviction(self):
+        cache = AnswerCache(max_entries=1)
+        cache.put("What is consent?", "consent", VECTORS["what is consent"])
+        cache.put("Right to erasure", "erasure", VECTORS["right to erasure"])
+        self.assertIsNone(cache.get("What is consent?")[0])
+
+        cache = AnswerCache(ttl_seconds=60)
+        cache.put("Right to erasure", "erasure", VECTORS["right to erasure"])
+        cache.entries["right to erasure"]["created_at"] = time.time() - 120
+        self.assertIsNone(cache.get("Right to erasure")[0])
+        self.assertEqual(len(cache.entries), 0)
+
+        # An expired entry is not returned as a semantic match either
+        cache.put("What is consent?", "consent", VECTORS["what is consent"])
+        cache.entries["what is consent"]["created_at"] = time.time() - 120
+        self.assertIsNone(cache.get("What does consent mean?", embed_query)[0])
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_disk_backend_invalidated_by_fingerprint(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "answer_cache")
+            cache = AnswerCache(path=path, fingerprint="index-a")
+            cache.put("What is consent?", "answer", VECTORS["what is consent"])
+            cache.close()
+
+            cache = AnswerCache(path=path, fingerprint="index-a")
+            self.assertEqual(cache.get("What is consent?")[0], "answer")
+            cache.close()
+
+            cache = AnswerCache(path=path, fingerprint="index-b")
+            self.assertIsNone(cache.get("What is consent?")[0])
+            cache.close()
+
+
+class TestRAGModelAnswerCache(unittest.TestCase):
+    def test_batch_queries_use_the_cache(self):
+        documents = DataPreparation().prepare_documents()
+        cache = AnswerCache()
+        rag_model = RAGModel(
+            FlatVectorStore(documents),
+            backend=StubBackend(latency=0.0, tokens_per_second=0, response="answer"),
+            answer_cache=cache,
+        )
+        first = rag_model.answer_queries(["What is consent?", "Right to erasure"], documents)
+        second = rag_model.answer_queries(["what is consent", "Right to erasure?"], documents)
+        self.assertEqual(second, first)
+        self.assertEqual(cache.stats()["exact_hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from langchain_core.documents import Document
+from src.article_index import ArticleIndex, article_key, stem
+
+
+def make_document(article_number, keywords, content="Text"):
+    return Document(
+        page_content=content,
+        metadata={
+            "article_number": article_number,
+            "article_summary": f"Summary {article_number}",
+            "page": 1,
+            "keywords": keywords,
+        },
+    )
+
+
+class TestArticleIndex(unittest.TestCase):
+    def setUp(self):
+        self.documents = [
+            make_document(6, "processing, lawfulness, legal basis"),
+            make_document(6, "processing, lawfulness, legal basis", "More text"),
+            make_document(7, "consent, conditions, withdraw"),
+            make_document(17, "erasure, right, C-136/17"),
+        ]
+        self.index = ArticleIndex(self.documents)
+
+    def test_articles_and_documents_by_article(self):
+        self.assertEqual([number for number, _, _ in self.index.articles], [6, 7, 17])
+        self.assertEqual(self.index.documents_by_article["6"], self.documents[:2])
+
+    def test_stemming(self):
+        self.assertEqual(stem("purposes"), stem("purpose"))
+        self.assertEqual(stem("processing"), stem("processed"))
+        self.assertEqual(stem("2016/679"), "2016/679")
+
+    def test_keyword_matches(self):
+        matches = self.index.keyword_matches("Can I withdraw my Consents? What legal basis applies?")
+        self.assertEqual(matches, {0: ["legal basis"], 1: ["withdraw", "consents"]})
+        self.assertEqual(self.index.keyword_matches("Tell me about c-136/17"), {2: ["c-136/17"]})
+
+    def test_mentioned_articles(self):
+        self.assertEqual(self.index.mentioned_articles("Compare Article 17 and article  6"), {"17", "6"})
+        self.assertEqual(self.index.mentioned_articles("What does article 17a say?"), set())
+        self.assertEqual(self.index.mentioned_articles("See article 1"), {"1"})
+
+    def test_articles_from_several_sources_stay_apart(self):
+        documents = [make_document(5, "consent"), make_document(5, "erasure")]
+        documents[0].metadata["source"] = "a.pdf"
+        documents[1].metadata["source"] = "b.pdf"
+        index = ArticleIndex(documents)
+        self.assertEqual(list(index.documents_by_article), ["a.pdf#5", "b.pdf#5"])
+        self.assertEqual(index.article_sources, ["a.pdf", "b.pdf"])
+        self.assertEqual(article_key({"article_number": 5, "source": None}), "5")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from benchmarks.run_benchmarks import find_regressions, summarize
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_summarize(self):
+        stats = summarize([3.0, 1.0, 2.0])
+        self.assertEqual(stats["runs"], 3)
+        self.assertEqual(stats["p50_ms"], 2.0)
+        self.assertAlmostEqual(stats["mean_ms"], 2.0)
+
+    def test_find_regressions(self):
+        baseline = {"stages": {"vector_search": {"p50_ms": 10.0}, "article_scores": {"p50_ms": 2.0}}}
+        results = {
+            "stages": {
+                "vector_search": {"p50_ms": 13.0},
+                "article_scores": {"p50_ms": 2.1},
+                "prompt_assembly": {"p50_ms": 1.0},
+            }
+        }
+        regressions = find_regressions(results, baseline, max_regression=20)
+        self.assertEqual(list(regressions), ["vector_search"])
+        self.assertAlmostEqual(regressions["vector_search"]["change_percent"], 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from langchain_core.documents import Document
+from src.bm25 import BM25Index, reciprocal_rank_fusion
+
+
+def make_document(article_number, content):
+    return Document(page_content=content, metadata={"article_number": article_number, "page": 1})
+
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.documents = [
+            make_document(1, "This Regulation repeals Directive 95/46/EC."),
+            make_document(1, "The Regulation protects natural persons."),
+            make_document(17, "The right to erasure, see C-131/12 and Directive 95/46/EC."),
+            make_document(17, "Erasure of personal data without undue delay."),
+        ]
+        self.index = BM25Index(self.documents)
+
+    def test_exact_identifier_match(self):
+        results = self.index.search("What did Directive 95/46/EC say?", top_k=3)
+        self.assertEqual(sorted(row for row, _ in results), [0, 2])
+        self.assertEqual(self.index.search("C-131/12", top_k=3)[0][0], 2)
+        # Questions usually leave out the suffix of 95/46/EC
+        self.assertEqual(sorted(row for row, _ in self.index.search("Directive 95/46", top_k=3)), [0, 2])
+
+    def test_restricted_to_articles(self):
+        results = self.index.search("erasure", article_numbers=["17"], top_k=5)
+        self.assertEqual({row for row, _ in results}, {2, 3})
+        self.assertEqual(self.index.search("erasure", article_numbers=["1"], top_k=5), [])
+        self.assertEqual(self.index.search("erasure", article_numbers=["99"], top_k=5), [])
+
+    def test_scores_sorted_and_top_k(self):
+        results = self.index.search("the regulation", top_k=2)
+        self.assertEqual(len(results), 2)
+        self.assertGreaterEqual(results[0][1], results[1][1])
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60)
+        self.assertAlmostEqual(fused["b"], 1 / 62 + 1 / 61)
+        self.assertEqual(max(fused, key=fused.get), "b")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import asyncio
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from src.console_interface import run_console_interface
+
+
+class LoopBoundBackend:
+    # Like an httpx.AsyncClient: fails when used from a different event loop
+    def __init__(self):
+        self.loop = None
+
+    async def astream(self, query):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop or self.loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+        for token in ["Answer ", "to ", query]:
+            yield token
+
+
+class StreamingRAGModel:
+    def __init__(self):
+        self.backend = LoopBoundBackend()
+
+    async def astream_answer(self, query, documents):
+        return [], [], self.backend.astream(query)
+
+
+class TestConsoleInterface(unittest.TestCase):
+    def test_streams_several_questions_through_one_backend(self):
+        output = io.StringIO()
+        with mock.patch("builtins.input", side_effect=["first", "second", "quit"]), redirect_stdout(output):
+            run_console_interface(StreamingRAGModel(), [], hide_documents=True)
+        self.assertIn("Answer to first", output.getvalue())
+        self.assertIn("Answer to second", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from langchain_core.documents import Document
+from src.data_loading import get_summary_embeddings, load_documents_snapshot, save_documents_snapshot
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+class TestSummaryEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.summaries_path = os.path.join(self.tmp_dir.name, "summaries.json")
+        self.embeddings_path = os.path.join(self.tmp_dir.name, "summary_embeddings.npy")
+        self._write_summaries({"1": "First article.", "2": "Second article summary."})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_summaries(self, summaries):
+        with open(self.summaries_path, "w") as f:
+            json.dump(summaries, f)
+
+    def _load(self, embeddings, model_name="model-a"):
+        return get_summary_embeddings(
+            embeddings, model_name, self.summaries_path, self.embeddings_path
+        )
+
+    def test_matrix_is_normalized_and_persisted(self):
+        embeddings = CountingEmbeddings()
+        stored = self._load(embeddings)
+        self.assertEqual(stored["article_numbers"], ["1", "2"])
+        self.assertEqual(stored["embeddings"].dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(stored["embeddings"], axis=1), 1.0, rtol=1e-6)
+        self.assertTrue(os.path.exists(self.embeddings_path))
+
+        self._load(embeddings)
+        self.assertEqual(embeddings.calls, 1)
+
+    def test_rebuild_on_summary_or_model_change(self):
+        embeddings = CountingEmbeddings()
+        self._load(embeddings)
+
+        self._write_summaries({"1": "First article, edited.", "2": "Second article summary."})
+        stored = self._load(embeddings)
+        self.assertEqual(embeddings.calls, 2)
+        self.assertEqual(stored["summaries"][0], "First article, edited.")
+
+        self._load(embeddings, model_name="model-b")
+        self.assertEqual(embeddings.calls, 3)
+
+
+class TestDocumentsSnapshot(unittest.TestCase):
+    def test_round_trip_and_stale_fingerprint(self):
+        article_1 = {"article_number": 1, "article_summary": "Résumé one.", "keywords": "a, b"}
+        documents = [
+            Document(page_content="First chunk – é.", metadata={**article_1, "page": 3}),
+            Document(page_content="Second chunk.", metadata={**article_1, "page": 4}),
+            Document(
+                page_content="Third chunk.",
+                metadata={"article_number": 2, "article_summary": "Two.", "page": 5, "source": "b.pdf"},
+            ),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_path = os.path.join(tmp_dir, "snapshot")
+            self.assertIsNone(load_documents_snapshot(snapshot_path, "fp"))
+
+            save_documents_snapshot(snapshot_path, documents, "fp")
+            loaded = load_documents_snapshot(snapshot_path, "fp")
+            self.assertEqual(loaded, documents)
+            self.assertEqual(list(loaded[2].metadata), list(documents[2].metadata))
+            # Article-level fields are stored, and loaded, once per article
+            self.assertIs(
+                loaded[0].metadata["article_summary"], loaded[1].metadata["article_summary"]
+            )
+            self.assertIsNone(load_documents_snapshot(snapshot_path, "other"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import os
+import shutil
+import tempfile
 import unittest
-from src.data_preparation import DataPreparation
+from src.article_index import article_key
+from src.data_preparation import DataPreparation, hash_article, iter_pdf_paths
 from src import constants
 
 class TestDataPreparation(unittest.TestCase):
@@ -40,5 +44,42 @@ class TestDataPreparation(unittest.TestCase):
             self.assertIn('page', doc.metadata)
             self.assertIn('keywords', doc.metadata)
 
+    def test_split_text_with_offsets_handles_repeated_text(self):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+        text = "repeated boilerplate text " * 20
+        text_splitter = RecursiveCharacterTextSplitter(chunk_size=60, chunk_overlap=10)
+        chunks = self.data_preparation.split_text_with_offsets(text_splitter, text, 10)
+        starts = [start for _, start in chunks]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(len(set(starts)), len(starts))
+        for chunk, start in chunks:
+            self.assertEqual(text[start:start + len(chunk)], chunk)
+
+    def test_prepare_documents_streaming(self):
+        documents = self.data_preparation.prepare_documents()
+        streamed = self.data_preparation.prepare_documents_streaming(page_window=8, workers=2)
+        self.assertEqual(streamed, documents)
+        stats = self.data_preparation.ingestion_stats
+        self.assertEqual(stats["chunks"], len(documents))
+        self.assertGreater(stats["pages_per_second"], 0)
+
+    def test_streaming_directory_of_pdfs_keys_articles_by_source(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in ("b.pdf", "a.pdf"):
+                shutil.copy(constants.PDF_PATH, os.path.join(tmp_dir, name))
+            self.assertEqual(
+                iter_pdf_paths(tmp_dir), [os.path.join(tmp_dir, "a.pdf"), os.path.join(tmp_dir, "b.pdf")]
+            )
+            articles = self.data_preparation.prepare_articles(tmp_dir, streaming=True, workers=1)
+        single = self.data_preparation.prepare_articles()
+        self.assertEqual(len(articles), 2 * len(single))
+        self.assertEqual(
+            [article_key(article) for article in articles],
+            [f"{source}#{article['article_number']}" for source in ("a.pdf", "b.pdf") for article in single],
+        )
+        self.assertEqual(len({hash_article(article) for article in articles}), len(articles))
+        self.assertEqual(articles[0]["summary"], "Summary not available")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
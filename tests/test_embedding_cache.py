@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.embedding_cache import EmbeddingCache, embed_texts
+
+
+class CountingEmbeddings:
+    def __init__(self, model_name="model-a"):
+        self.model_name = model_name
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), float(text.count("a")), 1.0] for text in texts]
+
+
+class TestEmbedTexts(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "embeddings.sqlite")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_duplicates_embedded_once_in_batches(self):
+        embeddings = CountingEmbeddings()
+        texts = ["alpha", "beta", "alpha", "gamma", "delta", "beta"]
+        vectors, stats = embed_texts(texts, embeddings, batch_size=2)
+        self.assertEqual(embeddings.calls, [["alpha", "beta"], ["gamma", "delta"]])
+        np.testing.assert_array_equal(vectors, np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+        self.assertEqual((stats["chunks"], stats["unique"], stats["embedded"]), (6, 4, 4))
+        self.assertGreater(stats["chunks_per_second"], 0)
+
+    def test_cache_reused_across_runs_and_keyed_by_model(self):
+        embeddings = CountingEmbeddings()
+        cache = EmbeddingCache(self.path)
+        first, _ = embed_texts(["alpha", "beta"], embeddings, cache)
+        cache.close()
+
+        cache = EmbeddingCache(self.path)
+        embeddings.calls.clear()
+        vectors, stats = embed_texts(["beta", "alpha", "new"], embeddings, cache)
+        self.assertEqual(embeddings.calls, [["new"]])
+        self.assertEqual(stats["cached"], 2)
+        np.testing.assert_array_equal(vectors[:2], first[::-1])
+
+        other_model = CountingEmbeddings("model-b")
+        embed_texts(["alpha"], other_model, cache)
+        self.assertEqual(other_model.calls, [["alpha"]])
+        self.assertEqual(len(cache), 4)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
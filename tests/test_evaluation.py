@@ -0,0 +1,84 @@
+import unittest
+from src.data_preparation import DataPreparation
+from langchain_core.documents import Document
+from src.evaluation import PrecomputedEmbeddings, prepare_evaluation, run_evaluation, score_question, validate_questions, weight_grid
+
+
+class TestEvaluationMetrics(unittest.TestCase):
+    def test_score_question(self):
+        question = {"question": "q", "articles": ["15", "16"]}
+        retrieved = [("3", 14), ("16", 110), ("15", 105)]
+        scores = score_question(question, retrieved, k_values=(1, 2, 3))
+        self.assertEqual(scores, {"recall@1": 0.0, "recall@2": 0.5, "recall@3": 1.0, "mrr": 0.5})
+
+        # With pages, chunks of the article on other pages do not count
+        question = {"question": "q", "articles": ["16"], "pages": [111]}
+        self.assertEqual(score_question(question, retrieved, k_values=(3,))["mrr"], 0.0)
+
+    def test_weight_grid(self):
+        grid = weight_grid({"keyword_match_score": [0.1, 0.3], "parts_to_retrieve": [20.0]})
+        self.assertEqual(
+            grid,
+            [
+                {"keyword_match_score": 0.1, "parts_to_retrieve": 20},
+                {"keyword_match_score": 0.3, "parts_to_retrieve": 20},
+            ],
+        )
+        self.assertEqual(weight_grid({}), [{}])
+        with self.assertRaises(ValueError):
+            weight_grid({"unknown_score": [1.0]})
+
+    def test_precomputed_embeddings_fall_back_to_the_model(self):
+        class CountingEmbeddings:
+            calls = 0
+
+            def embed_documents(self, texts):
+                self.calls += 1
+                return [[float(len(text))] for text in texts]
+
+        model = CountingEmbeddings()
+        embeddings = PrecomputedEmbeddings({"known": [1.0]}, embeddings=model)
+        self.assertEqual(embeddings.embed_documents(["known", "new summary"]), [[1.0], [11.0]])
+        self.assertEqual(embeddings.embed_query("new summary"), [11.0])
+        self.assertEqual(model.calls, 1)
+
+    def test_validate_questions(self):
+        documents = [Document(page_content="Text", metadata={"article_number": 17, "page": 1})]
+        validate_questions([{"question": "q", "articles": ["17"]}], documents)
+        for questions in (
+            [],
+            [{"question": "q", "articles": []}],
+            [{"question": "q"}],
+            [{"question": "q", "articles": ["99"]}],
+        ):
+            with self.assertRaises(ValueError):
+                validate_questions(questions, documents)
+
+
+class TestRunEvaluation(unittest.TestCase):
+    def test_sweep_reuses_precomputed_embeddings(self):
+        questions = [
+            {"question": "What is the right to erasure?", "articles": ["17"]},
+            {"question": "What are the conditions for consent?", "articles": ["7"]},
+            {"question": "Explain Article 20", "articles": ["20"]},
+        ]
+        state = prepare_evaluation(questions, DataPreparation().prepare_documents())
+        report = run_evaluation(
+            state,
+            questions,
+            grid=weight_grid({"article_mention_score": [0.0, 0.3]}),
+            workers=1,
+        )
+        self.assertEqual(report["settings"], 2)
+        self.assertGreater(report["queries_per_second"], 0)
+        self.assertEqual(len(report["results"]), 2)
+        for result in report["results"]:
+            for name in ("recall@1", "recall@3", "mrr"):
+                self.assertGreaterEqual(result[name], 0.0)
+                self.assertLessEqual(result[name], 1.0)
+        mrrs = [result["mrr"] for result in report["results"]]
+        self.assertEqual(mrrs, sorted(mrrs, reverse=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
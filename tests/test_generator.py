@@ -0,0 +1,88 @@
+import asyncio
+import time
+import unittest
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeStreamingListLLM
+from src.generator import Generator, assemble_context, count_tokens
+from src.llm_backends import LangChainBackend, LLMBackend, StubBackend
+
+
+class TestGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = Generator(
+            LangChainBackend(FakeStreamingListLLM(responses=["Consent must be freely given."]))
+        )
+        self.relevant_docs = [
+            (Document(page_content="Consent text.", metadata={"article_number": 7, "page": 50}), 1.0)
+        ]
+
+    def test_prepare_context_includes_location(self):
+        context = self.generator._prepare_context(self.relevant_docs)
+        self.assertIn("[Article 7 | Page 50]", context)
+        self.assertIn("Consent text.", context)
+
+    def test_context_merges_overlapping_chunks_per_location(self):
+        first = "Personal data shall be processed lawfully, fairly and in a transparent manner."
+        second = "in a transparent manner. Personal data shall be collected for specified purposes."
+        relevant_docs = [
+            (Document(page_content=first, metadata={"article_number": 5, "page": 41}), 1.0),
+            (Document(page_content="Other page.", metadata={"article_number": 5, "page": 42}), 0.9),
+            (Document(page_content=second, metadata={"article_number": 5, "page": 41}), 0.8),
+            (Document(page_content=first, metadata={"article_number": 5, "page": 41}), 0.7),
+        ]
+        context, stats = assemble_context(relevant_docs)
+        self.assertEqual(
+            context,
+            "[Article 5 | Page 41]\n"
+            "Personal data shall be processed lawfully, fairly and in a transparent manner. "
+            "Personal data shall be collected for specified purposes.\n\n"
+            "[Article 5 | Page 42]\nOther page.\n\n",
+        )
+        self.assertEqual((stats["merged"], stats["dropped"]), (2, 0))
+
+    def test_context_respects_token_budget(self):
+        relevant_docs = [
+            (Document(page_content=f"Chunk {index} " + "text " * 40, metadata={"article_number": 6, "page": index}), 1.0)
+            for index in range(10)
+        ]
+        context, stats = assemble_context(relevant_docs, token_budget=150)
+        self.assertLessEqual(count_tokens(context), 150)
+        self.assertIn("[Article 6 | Page 0]", context)
+        self.assertNotIn("[Article 6 | Page 9]", context)
+        self.assertGreater(stats["dropped"], 0)
+        self.assertAlmostEqual(count_tokens(context), stats["tokens"], delta=context.count("[Article"))
+
+    def test_stream_matches_blocking_answer(self):
+        async def collect():
+            return [token async for token in self.generator.astream_answer("What is consent?", self.relevant_docs)]
+
+        tokens = asyncio.run(collect())
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual("".join(tokens), self.generator.generate_answer("What is consent?", self.relevant_docs))
+
+
+    def test_stub_backend_is_deterministic_and_cites_locations(self):
+        generator = Generator(StubBackend(latency=0.0, tokens_per_second=0))
+        answer = generator.generate_answer("What is consent?", self.relevant_docs)
+        self.assertIn("[Article 7 | Page 50]", answer)
+        self.assertEqual(answer, generator.generate_answer("What is consent?", self.relevant_docs))
+        self.assertEqual(asyncio.run(generator.agenerate_answer("What is consent?", self.relevant_docs)), answer)
+
+    def test_stub_backend_latency_and_token_rate(self):
+        backend = StubBackend(latency=0.05, tokens_per_second=200, response="one two three four")
+        start = time.perf_counter()
+        tokens = list(backend.stream("prompt"))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(tokens, ["one ", "two ", "three ", "four"])
+        self.assertGreaterEqual(elapsed, 0.05 + 4 / 200)
+
+    def test_backend_without_invoke_cannot_be_created(self):
+        class IncompleteBackend(LLMBackend):
+            def stream(self, prompt):
+                yield "token"
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+
+if __name__ == '__main__':
+    unittest.main()
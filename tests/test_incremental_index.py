@@ -0,0 +1,130 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from functools import partial
+from src.data_preparation import DataPreparation, create_text_splitter
+from src.vectorization import FINGERPRINT_FILE, SegregatedVectorStore, compute_settings_fingerprint
+
+
+class CountingEmbeddings:
+    # Deterministic offline embeddings that count the texts they embed
+    def __init__(self):
+        self.embedded = 0
+
+    def _embed(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255.0 for byte in digest[:8]]
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_article(article_number, text, summary="Summary", keywords="a, b", source=None):
+    return {
+        "source": source,
+        "article_number": article_number,
+        "pages": [[article_number, text]],
+        "content": text,
+        "summary": summary,
+        "keywords": keywords,
+    }
+
+
+class TestIncrementalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.embeddings = CountingEmbeddings()
+        data_preparation = DataPreparation()
+        self.article_documents = partial(
+            data_preparation.article_documents,
+            text_splitter=create_text_splitter(100, 10),
+            chunk_overlap=10,
+        )
+        self.articles = [
+            make_article(number, f"Article {number} text. " * 10) for number in (1, 2, 3)
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _update(self, articles):
+        return SegregatedVectorStore.load_or_update(
+            lambda: articles,
+            self.article_documents,
+            compute_settings_fingerprint(100, 10, "test"),
+            persist_directory=self.tmp_dir.name,
+            embeddings=self.embeddings,
+        )
+
+    def _expected_documents(self, articles):
+        return [doc for article in articles for doc in self.article_documents(article)]
+
+    def test_only_changed_articles_are_reembedded(self):
+        store, documents = self._update(self.articles)
+        self.assertTrue(store.update_stats["rebuilt"])
+        self.assertEqual(documents, self._expected_documents(self.articles))
+
+        # Unchanged corpus: nothing is embedded
+        self.embeddings.embedded = 0
+        store, documents = self._update(self.articles)
+        self.assertEqual(self.embeddings.embedded, 0)
+        self.assertEqual(documents, self._expected_documents(self.articles))
+
+        # Article 2 text changed, article 3 summary changed, article 1 removed, article 4 added
+        changed = [
+            make_article(2, "Rewritten article two. " * 12),
+            make_article(3, "Article 3 text. " * 10, summary="New summary"),
+            make_article(4, "Article 4 text. " * 5),
+        ]
+        self.embeddings.embedded = 0
+        store, documents = self._update(changed)
+        self.assertEqual(
+            {key: store.update_stats[key] for key in ("added", "updated", "metadata_updated", "removed")},
+            {"added": 1, "updated": 1, "metadata_updated": 1, "removed": 1},
+        )
+        changed_documents = self._expected_documents(changed)
+        # Identical chunk texts are embedded once
+        reembedded = self._expected_documents(changed[:1]) + self._expected_documents(changed[2:])
+        self.assertEqual(
+            self.embeddings.embedded, len({doc.page_content for doc in reembedded})
+        )
+        self.assertEqual(list(store.article_stores), ["2", "3", "4"])
+        self.assertEqual(documents, changed_documents)
+
+    def test_articles_are_keyed_by_source(self):
+        articles = [
+            make_article(1, "Article 1 of the first PDF. " * 5, source="a.pdf"),
+            make_article(1, "Article 1 of the second PDF. " * 5, source="b.pdf"),
+        ]
+        store, documents = self._update(articles)
+        self.assertEqual(list(store.article_stores), ["a.pdf#1", "b.pdf#1"])
+        self.assertEqual(store.get_documents(), self._expected_documents(articles))
+
+        changed = [articles[0], make_article(1, "Rewritten second PDF. " * 5, source="b.pdf")]
+        store, documents = self._update(changed)
+        self.assertEqual(store.update_stats["updated"], 1)
+        self.assertEqual(store.update_stats["added"], 0)
+        self.assertEqual(store.get_documents(), self._expected_documents(changed))
+
+    def test_duplicate_article_numbers_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self._update(self.articles + [make_article(2, "Another article two.")])
+
+    def test_rebuild_replaces_existing_chunks(self):
+        store, _ = self._update(self.articles)
+        store.replace_article("2", self.article_documents(self.articles[1]))
+
+        # A lost manifest forces a full rebuild into the same Chroma directory
+        os.remove(os.path.join(self.tmp_dir.name, FINGERPRINT_FILE))
+        store, documents = self._update(self.articles)
+        self.assertTrue(store.update_stats["rebuilt"])
+        self.assertEqual(store.get_documents(), self._expected_documents(self.articles))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+from src.instrumentation import NOOP_SPAN, JsonLinesExporter, PrometheusExporter, Tracer
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_disabled_tracer_is_noop(self):
+        tracer = Tracer()
+        self.assertIs(tracer.span("retrieval.vector_search"), NOOP_SPAN)
+
+    def test_trace_collects_timings_when_disabled(self):
+        tracer = Tracer()
+        with tracer.trace() as timings:
+            with tracer.span("retrieval.vector_search"):
+                pass
+            with tracer.span("retrieval.vector_search"):
+                pass
+        self.assertEqual(list(timings), ["retrieval.vector_search"])
+        self.assertGreaterEqual(timings["retrieval.vector_search"], 0.0)
+        self.assertIs(tracer.span("retrieval.vector_search"), NOOP_SPAN)
+
+    def test_prometheus_exporter(self):
+        exporter = PrometheusExporter()
+        tracer = Tracer([exporter], enabled=True)
+        with tracer.span("generation.llm"):
+            pass
+        tracer.count("rag.queries")
+        tracer.count("generation.prompt_tokens", 120)
+        text = exporter.render()
+        self.assertIn("gdpr_rag_rag_queries_total 1", text)
+        self.assertIn("gdpr_rag_generation_prompt_tokens_total 120", text)
+        self.assertIn('gdpr_rag_stage_duration_seconds_count{stage="generation.llm"} 1', text)
+
+    def test_json_lines_exporter(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "trace.jsonl")
+            exporter = JsonLinesExporter(path)
+            tracer = Tracer([exporter], enabled=True)
+            with tracer.span("retrieval.article_scores"):
+                pass
+            tracer.count("answer_cache.misses")
+            exporter.close()
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual([r["type"] for r in records], ["span", "counter"])
+        self.assertEqual(records[0]["name"], "retrieval.article_scores")
+
+
+if __name__ == '__main__':
+    unittest.main()
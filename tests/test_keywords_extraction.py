@@ -0,0 +1,27 @@
+import unittest
+from src.keywords_extraction import extract_keywords, extract_keywords_batch
+
+ARTICLES = [
+    "Consent of the data subject must be freely given. Consent can be withdrawn at any time.",
+    "The controller shall erase personal data without undue delay. Erasure follows C-131/12.",
+    "Processing of personal data of a child requires parental authorisation for the child.",
+]
+
+
+class TestKeywordsExtraction(unittest.TestCase):
+    def test_batch_matches_single_article_extraction(self):
+        batch_keywords = extract_keywords_batch(ARTICLES)
+        self.assertEqual(len(batch_keywords), len(ARTICLES))
+        for article, keywords in zip(ARTICLES, batch_keywords):
+            self.assertEqual(keywords, extract_keywords(article, ARTICLES))
+
+    def test_keywords_are_article_specific(self):
+        consent, erasure, child = extract_keywords_batch(ARTICLES)
+        self.assertEqual(consent[0], "consent")
+        self.assertEqual(erasure[0], "C-131/12")
+        self.assertIn("child", child)
+        self.assertNotIn("personal", consent)
+
+
+if __name__ == '__main__':
+    unittest.main()
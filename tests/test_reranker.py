@@ -0,0 +1,59 @@
+import time
+import unittest
+from langchain_core.documents import Document
+from src.reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    # Scores a pair by how many query words the chunk contains
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        time.sleep(self.delay)
+        self.batches.append(len(pairs))
+        return [
+            float(sum(word in text.split() for word in query.split())) for query, text in pairs
+        ]
+
+
+def make_documents(texts):
+    return [Document(page_content=text, metadata={"article_number": 1, "page": 1}) for text in texts]
+
+
+class TestCrossEncoderReranker(unittest.TestCase):
+    def setUp(self):
+        self.documents = make_documents(
+            ["unrelated text", "consent given", "consent must be freely given", "given"]
+        )
+
+    def test_scores_in_batches_and_caches(self):
+        model = FakeCrossEncoder()
+        reranker = CrossEncoderReranker(model=model, batch_size=3, latency_budget_ms=None)
+        scores = reranker.score("consent freely given", self.documents)
+        self.assertEqual(list(scores), [0.0, 2.0, 3.0, 1.0])
+        self.assertEqual(model.batches, [3, 1])
+
+        # A repeated query is answered from the cache
+        self.assertEqual(list(reranker.score("consent freely given", self.documents)), list(scores))
+        self.assertEqual(model.batches, [3, 1])
+        self.assertEqual(reranker.stats()["cache_hits"], 4)
+
+    def test_falls_back_when_over_latency_budget(self):
+        model = FakeCrossEncoder(delay=0.05)
+        reranker = CrossEncoderReranker(model=model, batch_size=2, latency_budget_ms=20)
+        reranker.warm_up()
+        self.assertIsNone(reranker.score("consent", self.documents))
+        self.assertEqual(reranker.stats()["fallbacks"], 1)
+
+    def test_cache_is_bounded(self):
+        reranker = CrossEncoderReranker(
+            model=FakeCrossEncoder(), latency_budget_ms=None, max_cache_entries=3
+        )
+        reranker.score("consent", self.documents)
+        self.assertEqual(len(reranker.cache), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
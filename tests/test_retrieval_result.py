@@ -0,0 +1,57 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from langchain_core.documents import Document
+from src.console_interface import print_retrieved_documents
+from src.retrieval_result import RetrievedParts
+
+
+def make_document(article_number, page, content):
+    return Document(page_content=content, metadata={"article_number": article_number, "page": page})
+
+
+class TestRetrievedParts(unittest.TestCase):
+    def setUp(self):
+        # Two identical Documents with different scores must keep their own scores
+        self.parts = RetrievedParts(
+            [
+                (make_document(17, 3, "Same text"), 0.9),
+                (make_document(6, 1, "Other text"), 0.8),
+                (make_document(17, 3, "Same text"), 0.7),
+            ],
+            chunk_ids=[4, 0, 5],
+        )
+
+    def test_arrays(self):
+        self.assertEqual(len(self.parts), 3)
+        self.assertEqual(self.parts.chunk_ids.tolist(), [4, 0, 5])
+        self.assertEqual(self.parts.article_keys, ["17", "6", "17"])
+        self.assertEqual(self.parts.indices_by_article(), {"17": [0, 2], "6": [1]})
+        self.assertEqual(RetrievedParts().chunk_ids.tolist(), [])
+
+        # Article keys follow the list contents
+        self.parts.append((make_document(7, 2, "New text"), 0.6))
+        self.assertEqual(self.parts.article_keys, ["17", "6", "17", "7"])
+        self.assertEqual(self.parts.indices_by_article()["7"], [3])
+
+    def test_print_retrieved_documents(self):
+        article_scores = [
+            {"article_number": 6, "reasons": ["Keyword matches: processing"]},
+            {"article_number": 17, "reasons": ["Exact article 17 mention"]},
+        ]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            print_retrieved_documents(self.parts, article_scores)
+        text = output.getvalue()
+        self.assertLess(text.index("Article 6:"), text.index("Article 17:"))
+        self.assertIn("Relevance Score: 0.9000", text)
+        self.assertIn("Relevance Score: 0.7000", text)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            print_retrieved_documents(list(self.parts), article_scores)
+        self.assertEqual(output.getvalue(), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
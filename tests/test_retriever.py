@@ -1,8 +1,18 @@
 import unittest
+from unittest import mock
 from src.retriever import Retriever
+from src.reranker import CrossEncoderReranker
+from src.retrieval_result import RetrievedParts
 from src.vectorization import SegregatedVectorStore
 from src.data_preparation import DataPreparation
 
+
+class LengthCrossEncoder:
+    # Scores a chunk by its length, so the expected rerank order is known
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        return [float(len(text)) for _, text in pairs]
+
+
 class TestRetriever(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -18,6 +28,73 @@ class TestRetriever(unittest.TestCase):
         self.assertIsInstance(article_scores, list)
         self.assertTrue(len(relevant_docs) > 0)
         self.assertTrue(len(article_scores) > 0)
+        self.assertIsInstance(relevant_docs, RetrievedParts)
+        for (doc, _), chunk_id in zip(relevant_docs, relevant_docs.chunk_ids):
+            self.assertEqual(self.documents[chunk_id], doc)
+
+    def test_query_embedded_once(self):
+        self.assertIs(self.retriever.embeddings, self.retriever.segregated_vector_store.embeddings)
+        embeddings_class = type(self.retriever.embeddings)
+        with mock.patch.object(
+            embeddings_class, "embed_query", autospec=True, side_effect=embeddings_class.embed_query
+        ) as embed_query:
+            self.retriever.get_relevant_documents("What is the right to erasure?", self.documents)
+        self.assertEqual(embed_query.call_count, 1)
+
+    def test_get_relevant_documents_batch_matches_single(self):
+        queries = ["What is consent?", "Explain the right to erasure", "What is Article 5 about?"]
+        batch_results = self.retriever.get_relevant_documents_batch(queries, self.documents)
+        self.assertEqual(len(batch_results), len(queries))
+        for query, (relevant_docs, article_scores) in zip(queries, batch_results):
+            single_docs, single_scores = self.retriever.get_relevant_documents(query, self.documents)
+            self.assertEqual([doc for doc, _ in relevant_docs], [doc for doc, _ in single_docs])
+            self.assertEqual(
+                [a["article_number"] for a in article_scores],
+                [a["article_number"] for a in single_scores],
+            )
+
+    def test_rerank_reorders_first_stage_candidates(self):
+        query = "What is the right to erasure?"
+        query_embedding = self.retriever.embeddings.embed_query(query)
+        articles, article_scores = self.retriever._select_relevant_articles(query, query_embedding, self.documents, 3)
+        first_stage = self.retriever._select_relevant_parts(query, articles, 10, article_scores, query_embedding)
+        reranker = CrossEncoderReranker(model=LengthCrossEncoder(), candidate_cap=10, latency_budget_ms=None)
+        reranking_retriever = Retriever(self.retriever.segregated_vector_store, reranker=reranker)
+        reranked = reranking_retriever._select_relevant_parts(
+            query, articles, 3, article_scores, query_embedding, reranking_retriever.get_article_index(self.documents)
+        )
+        self.assertEqual(
+            [doc for doc, _ in reranked],
+            sorted((doc for doc, _ in first_stage), key=lambda doc: -len(doc.page_content))[:3],
+        )
+        # Rerank scores are mapped onto the first-stage score range
+        scores = [score for _, score in reranked]
+        first_scores = [score for _, score in first_stage][:10]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertAlmostEqual(scores[0], max(first_scores))
+        self.assertGreaterEqual(scores[-1], min(first_scores))
+        for (doc, _), chunk_id in zip(reranked, reranked.chunk_ids):
+            self.assertEqual(self.documents[chunk_id], doc)
+
+    def test_rerank_cap_below_top_k_keeps_top_k_parts(self):
+        query = "What is the right to erasure?"
+        query_embedding = self.retriever.embeddings.embed_query(query)
+        articles, article_scores = self.retriever._select_relevant_articles(query, query_embedding, self.documents, 3)
+        first_stage = self.retriever._select_relevant_parts(query, articles, 5, article_scores, query_embedding)
+        reranker = CrossEncoderReranker(model=LengthCrossEncoder(), candidate_cap=2, latency_budget_ms=None)
+        reranking_retriever = Retriever(self.retriever.segregated_vector_store, reranker=reranker)
+        reranked = reranking_retriever._select_relevant_parts(
+            query, articles, 5, article_scores, query_embedding, reranking_retriever.get_article_index(self.documents)
+        )
+        self.assertEqual(len(reranked), 5)
+        first_docs = [doc for doc, _ in first_stage]
+        self.assertEqual(
+            [doc for doc, _ in reranked][:2],
+            sorted(first_docs[:2], key=lambda doc: -len(doc.page_content)),
+        )
+        self.assertEqual([doc for doc, _ in reranked][2:], first_docs[2:])
+        scores = [score for _, score in reranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
 
     def test_select_relevant_articles(self):
         query = "How to obtain valid consent?"
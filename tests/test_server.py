@@ -0,0 +1,49 @@
+import threading
+import time
+import unittest
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from src.server import create_app
+
+
+class StubRAGModel:
+    async def aanswer_query(self, query, documents):
+        relevant_docs = [(documents[0], 0.5)]
+        article_scores = [{"article_number": 7, "score": 0.8, "reasons": ["Keyword matches: consent"]}]
+        return f"Answer to: {query}", relevant_docs, article_scores
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.loaded = threading.Event()
+        self.documents = [Document(page_content="Consent text.", metadata={"article_number": 7, "page": 50})]
+
+    def load_components(self):
+        self.loaded.wait(timeout=5)
+        return StubRAGModel(), self.documents
+
+    def test_ready_and_query(self):
+        with TestClient(create_app(self.load_components)) as client:
+            self.assertEqual(client.get("/ready").status_code, 503)
+            self.assertEqual(client.post("/query", json={"query": "What is consent?"}).status_code, 503)
+
+            self.loaded.set()
+            for _ in range(50):
+                if client.get("/ready").status_code == 200:
+                    break
+                time.sleep(0.05)
+            self.assertEqual(client.get("/ready").json(), {"ready": True, "documents": 1})
+
+            response = client.post("/query", json={"query": "What is consent?"})
+            self.assertEqual(response.status_code, 200)
+            result = response.json()
+            self.assertEqual(result["answer"], "Answer to: What is consent?")
+            self.assertEqual(result["documents"][0]["page"], 50)
+            self.assertEqual(result["article_scores"][0]["article_number"], 7)
+
+            response = client.post("/query", json={"query": "What is consent?", "include_documents": False})
+            self.assertNotIn("documents", response.json())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from langchain_core.documents import Document
+from src.data_loading import save_documents_snapshot
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importing main (and so running --help) must stay under this budget
+IMPORT_BUDGET_MS = 300
+HEAVY_MODULES = [
+    "fitz",
+    "langchain",
+    "langchain_core",
+    "langchain_text_splitters",
+    "langchain_community",
+    "langchain_huggingface",
+    "langchain_openai",
+    "sentence_transformers",
+    "torch",
+    "chromadb",
+    "sklearn",
+    "openai",
+    "dotenv",
+    "numpy",
+]
+
+
+def import_times(module):
+    # Top-level modules imported by `import module` and its cumulative import time in ms
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = set()
+    cumulative_ms = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        imported.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            cumulative_ms = int(cumulative) / 1000
+    return imported, cumulative_ms
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_main_skips_heavy_modules(self):
+        imported, _ = import_times("main")
+        self.assertEqual(sorted(imported & set(HEAVY_MODULES)), [])
+
+    def test_import_main_within_budget(self):
+        _, cumulative_ms = import_times("main")
+        self.assertLess(cumulative_ms, IMPORT_BUDGET_MS)
+
+    def test_snapshot_load_skips_pdf_and_splitting_libraries(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_path = os.path.join(tmp_dir, "snapshot")
+            save_documents_snapshot(
+                snapshot_path,
+                [Document(page_content="Text", metadata={"article_number": 1, "page": 2})],
+                "abc",
+            )
+            script = (
+                "import argparse, json, sys\n"
+                "import main\n"
+                f"args = argparse.Namespace(snapshot=True, snapshot_path={snapshot_path!r})\n"
+                "documents = main.load_documents(args, 'abc')\n"
+                "print(json.dumps([len(documents), sorted(m for m in "
+                "('fitz', 'langchain_text_splitters', 'sklearn') if m in sys.modules)]))\n"
+            )
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=REPO_ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        self.assertEqual(json.loads(result.stdout.splitlines()[-1]), [1, []])
+
+
+if __name__ == '__main__':
+    unittest.main()
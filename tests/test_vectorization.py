@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
-from src.vectorization import SegregatedVectorStore
+import numpy as np
+from langchain_core.documents import Document
+from src.vectorization import FlatVectorStore, SegregatedVectorStore, distance_to_similarity
 from src.data_preparation import DataPreparation
 
 class TestSegregatedVectorStore(unittest.TestCase):
@@ -13,6 +17,16 @@ class TestSegregatedVectorStore(unittest.TestCase):
         self.assertIsInstance(self.vector_store, SegregatedVectorStore)
         self.assertEqual(len(self.vector_store.article_stores), 21)
 
+    def test_in_memory_stores_are_isolated(self):
+        first = [Document(page_content="First store chunk.", metadata={"article_number": 1, "page": 1})]
+        second = [Document(page_content="Second store chunk.", metadata={"article_number": 1, "page": 1})]
+        first_store = SegregatedVectorStore(first, embeddings=self.vector_store.embeddings)
+        second_store = SegregatedVectorStore(second, embeddings=self.vector_store.embeddings)
+        second_store.replace_article("1", second)
+        self.assertEqual(first_store.get_documents(), first)
+        self.assertEqual(second_store.get_documents(), second)
+        self.assertEqual(len(self.vector_store.get_documents()), len(self.documents))
+
     def test_search(self):
         query = "What is personal data?"
         results = self.vector_store.search(query, top_k=3)
@@ -31,5 +45,110 @@ class TestSegregatedVectorStore(unittest.TestCase):
         for doc, score in results:
             self.assertIn(str(doc.metadata['article_number']), article_numbers)  # Convert to string
 
+    def test_persistent_index(self):
+        with tempfile.TemporaryDirectory() as persist_directory:
+            documents = self.documents[:20]
+            SegregatedVectorStore(documents, persist_directory=persist_directory, fingerprint="abc")
+
+            loaded = SegregatedVectorStore.load(persist_directory, "abc")
+            self.assertIsNotNone(loaded)
+            self.assertEqual(loaded.get_documents(), documents)
+            self.assertIsNone(SegregatedVectorStore.load(persist_directory, "stale"))
+
+    def test_flat_backend_matches_chroma(self):
+        flat_store = FlatVectorStore(self.documents, embeddings=self.vector_store.embeddings)
+        self.assertEqual(set(flat_store.article_ranges), set(self.vector_store.article_stores))
+        query = "What are the principles of data processing?"
+        article_numbers = ['5', '6']
+        flat_results = flat_store.search(query, article_numbers=article_numbers, top_k=5)
+        chroma_results = self.vector_store.search(query, article_numbers=article_numbers, top_k=5)
+        self.assertEqual(len(flat_results), 5)
+        # Both backends return similarities, most similar first
+        for results in (flat_results, chroma_results):
+            scores = [score for _, score in results]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+        for (flat_doc, flat_score), (_, chroma_score) in zip(flat_results, chroma_results):
+            self.assertIn(str(flat_doc.metadata['article_number']), article_numbers)
+            self.assertAlmostEqual(flat_score, chroma_score, places=3)
+
+    def test_search_ranks_the_nearest_chunk_first(self):
+        doc = self.documents[100]
+        query_embedding = self.vector_store.embeddings.embed_query(doc.page_content)
+        results = self.vector_store.search(
+            doc.page_content, article_numbers=[str(doc.metadata["article_number"])], top_k=3,
+            query_embedding=query_embedding,
+        )
+        self.assertEqual(results[0][0].page_content, doc.page_content)
+        self.assertAlmostEqual(results[0][1], 1.0, places=3)
+
+    def test_hybrid_search_mode(self):
+        query = "Tell me about C-136/17"
+        hybrid_store = FlatVectorStore(
+            self.documents, embeddings=self.vector_store.embeddings, search_mode="hybrid"
+        )
+        results = hybrid_store.search(query, top_k=5)
+        self.assertEqual(len(results), 5)
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        # Fused scores are on the [0, 1] scale of the dense similarities
+        self.assertTrue(all(0.0 < score <= 1.0 for score in scores))
+        # The exact legal identifier is found by the BM25 side of the fusion
+        self.assertTrue(any("C-136/17" in doc.page_content for doc, _ in results))
+
+        with self.assertRaises(ValueError):
+            FlatVectorStore(self.documents[:3], embeddings=self.vector_store.embeddings, search_mode="sparse")
+
+class TestCompressedFlatVectorStore(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.documents = [
+            Document(page_content=f"Chunk {i}", metadata={"article_number": i % 4, "page": i})
+            for i in range(200)
+        ]
+        # Low-rank vectors plus noise, like sentence embeddings
+        self.vectors = (
+            rng.normal(size=(200, 8)) @ rng.normal(size=(8, 32)) + 0.05 * rng.normal(size=(200, 32))
+        ).astype(np.float32)
+        self.queries = rng.normal(size=(10, 8)) @ rng.normal(size=(8, 32))
+        self.baseline = FlatVectorStore(self.documents, embeddings=object(), vectors=self.vectors)
+
+    def _recall(self, store, top_k=5):
+        recalls = []
+        for query_embedding in self.queries:
+            expected = self.baseline.search("", top_k=top_k, query_embedding=query_embedding)
+            found = store.search("", top_k=top_k, query_embedding=query_embedding)
+            recalls.append(
+                len({id(doc) for doc, _ in found} & {id(doc) for doc, _ in expected}) / top_k
+            )
+        return np.mean(recalls)
+
+    def test_int8_with_pca(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FlatVectorStore(
+                self.documents,
+                embeddings=object(),
+                vectors=self.vectors,
+                quantization="int8",
+                pca_dimensions=8,
+                vectors_path=os.path.join(tmp_dir, "vectors.npy"),
+            )
+            self.assertEqual(store.matrix.dtype, np.int8)
+            self.assertEqual(store.matrix.shape, (200, 8))
+            self.assertLess(store.bytes_per_chunk(), self.baseline.bytes_per_chunk() / 10)
+            self.assertGreaterEqual(self._recall(store), 0.9)
+
+            # Returned scores are exact, rescored from the full-precision vectors
+            query_embedding = self.queries[0]
+            for doc, similarity in store.search("", top_k=3, query_embedding=query_embedding):
+                row = self.documents.index(doc)
+                distance = float(np.sum((self.vectors[row] - query_embedding.astype(np.float32)) ** 2))
+                self.assertAlmostEqual(similarity, distance_to_similarity(distance), places=3)
+            del store
+
+    def test_unknown_quantization(self):
+        with self.assertRaises(ValueError):
+            FlatVectorStore(self.documents, embeddings=object(), vectors=self.vectors, quantization="int4")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file